@@ -0,0 +1,360 @@
+import json
+import os
+import sqlite3
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from schema import OUTPUT_DATE_FORMAT
+
+# Streaming SLA breach alerts for input.py runs. Every run is diffed
+# against the previous one by row hash; only new, changed and removed
+# orders update the per (Shipping Courier, Zone, day) counters kept in a
+# small SQLite store, and only the courier / zone days they touch are
+# re-evaluated. Breach and recovery events go to a JSONL file and,
+# optionally, are POSTed to a webhook.
+
+# ---------------- CONFIG ----------------
+STATE_FILE = "alerts_state.sqlite"
+EVENTS_FILE = "sla_alerts.jsonl"
+
+OUTTAT_THRESHOLD = 0.20   # Out-TAT share of delivered orders
+MIN_DELIVERED = 20        # ignore courier / zone days with fewer orders
+WEBHOOK_TIMEOUT = 5
+
+KEY_COLUMNS = ["Devx Order ID", "UNICOM Order ID", "Tracking No."]
+WATCH_COLUMNS = [
+    "Shipping Courier",
+    "Zone",
+    "UC Order Date (Date)",
+    "Final Status",
+    "Placed to Delivery TAT Status",
+]
+
+# Stands in for a blank cell when rows are hashed
+NA_TOKEN = "\x00NA"
+
+# Counter columns rates are evaluated over
+SCOPES = ["courier", "zone"]
+
+SQLITE_MAX_PARAMS = 500
+
+STATE_TABLES = """
+CREATE TABLE IF NOT EXISTS orders (
+    key INTEGER PRIMARY KEY,
+    row_hash INTEGER NOT NULL,
+    courier TEXT NOT NULL,
+    zone TEXT NOT NULL,
+    day TEXT NOT NULL,
+    delivered INTEGER NOT NULL,
+    outtat INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    courier TEXT NOT NULL,
+    zone TEXT NOT NULL,
+    day TEXT NOT NULL,
+    delivered INTEGER NOT NULL,
+    outtat INTEGER NOT NULL,
+    PRIMARY KEY (courier, zone, day)
+);
+CREATE INDEX IF NOT EXISTS counters_day ON counters (day);
+CREATE TABLE IF NOT EXISTS breaches (
+    scope TEXT NOT NULL,
+    name TEXT NOT NULL,
+    day TEXT NOT NULL,
+    outtat_rate REAL NOT NULL,
+    PRIMARY KEY (scope, name, day)
+);
+"""
+
+
+# ---------------- ROW IDENTITY ----------------
+def signed(hashes):
+    # SQLite integers are signed 64 bit
+    return np.asarray(hashes, dtype=np.uint64).view(np.int64)
+
+
+def canonical_text(values):
+    # Same text whatever the dtype: one blank turns an int column float, and
+    # dates may arrive parsed or as report strings
+    if pd.api.types.is_datetime64_any_dtype(values):
+        text = values.dt.strftime(OUTPUT_DATE_FORMAT)
+    elif pd.api.types.is_float_dtype(values):
+        whole = (values == values.round()) & (values.abs() < 2 ** 53)
+        text = values.astype(str)
+        text[whole] = values[whole].astype(np.int64).astype(str)
+    else:
+        text = values.astype(str)
+    return text.where(values.notna(), NA_TOKEN)
+
+
+def hash_columns(df, columns):
+    text = pd.DataFrame({col: canonical_text(df[col]) for col in columns})
+    return pd.util.hash_pandas_object(text, index=False).to_numpy()
+
+
+def order_keys(df):
+    # Orders repeat on reshipment, so the occurrence number is part of the key
+    keys = pd.DataFrame({"order": hash_columns(df, KEY_COLUMNS)})
+    keys["occurrence"] = keys.groupby("order").cumcount()
+    return signed(pd.util.hash_pandas_object(keys, index=False))
+
+
+def row_hashes(df):
+    return signed(hash_columns(df, WATCH_COLUMNS))
+
+
+# ---------------- CONTRIBUTIONS ----------------
+def iso_days(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        days = values
+    else:
+        days = pd.to_datetime(values, format=OUTPUT_DATE_FORMAT, errors="coerce")
+    return days.dt.strftime("%Y-%m-%d").fillna("")
+
+
+def contributions(df, keys, hashes):
+    # What each row adds to its (courier, zone, day) counter
+    final_status = df["Final Status"].astype(str).str.strip().str.lower()
+    tat_status = df["Placed to Delivery TAT Status"]
+
+    delivered = (final_status == "delivered") & tat_status.notna()
+    outtat = delivered & (tat_status.astype(str).str.strip().str.lower() == "outtat")
+
+    return pd.DataFrame({
+        "key": keys,
+        "row_hash": hashes,
+        "courier": df["Shipping Courier"].astype(object).fillna("").astype(str).to_numpy(),
+        "zone": df["Zone"].astype(object).fillna("").astype(str).to_numpy(),
+        "day": iso_days(df["UC Order Date (Date)"]).to_numpy(),
+        "delivered": delivered.astype(int).to_numpy(),
+        "outtat": outtat.astype(int).to_numpy(),
+    })
+
+
+# ---------------- STATE STORE ----------------
+def open_store(path=STATE_FILE):
+    connection = sqlite3.connect(path)
+    connection.executescript(STATE_TABLES)
+    return connection
+
+
+# The (key, row_hash) pairs of the last run also live in a .npz sidecar,
+# stamped with the store's generation (PRAGMA user_version, bumped in the
+# same transaction as every delta). A missing or stale sidecar falls back
+# to the orders table.
+def sidecar_path(state_file):
+    return state_file + ".hashes.npz"
+
+
+def store_generation(connection):
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def stored_hashes(connection, sidecar):
+    generation = store_generation(connection)
+    try:
+        with np.load(sidecar) as saved:
+            if int(saved["generation"]) == generation:
+                return pd.Series(saved["hashes"], index=saved["keys"])
+    except (OSError, KeyError, ValueError):
+        pass
+
+    rows = connection.execute("SELECT key, row_hash FROM orders").fetchall()
+    if not rows:
+        return pd.Series(dtype=np.int64)
+    table = np.array(rows, dtype=np.int64)
+    return pd.Series(table[:, 1], index=table[:, 0])
+
+
+def save_hashes(sidecar, generation, keys, hashes):
+    # Written aside and renamed; np.savez adds the .npz suffix
+    partial = sidecar[:-len(".npz")] + ".tmp"
+    np.savez(partial, generation=generation, keys=keys, hashes=hashes)
+    os.replace(partial + ".npz", sidecar)
+
+
+def stored_contributions(connection, keys):
+    frames = []
+    for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+        chunk = [int(key) for key in keys[start:start + SQLITE_MAX_PARAMS]]
+        frames.append(pd.read_sql_query(
+            "SELECT key, courier, zone, day, delivered, outtat FROM orders "
+            f"WHERE key IN ({','.join('?' * len(chunk))})",
+            connection,
+            params=chunk
+        ))
+    columns = ["key", "courier", "zone", "day", "delivered", "outtat"]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def apply_delta(connection, added, removed):
+    # Net counter change per (courier, zone, day); removed rows count negative
+    delta = pd.concat([
+        added[["courier", "zone", "day", "delivered", "outtat"]],
+        removed[["courier", "zone", "day"]].assign(
+            delivered=-removed["delivered"], outtat=-removed["outtat"]
+        ),
+    ])
+    delta = delta.groupby(["courier", "zone", "day"], as_index=False)[["delivered", "outtat"]].sum()
+
+    connection.executemany(
+        """
+        INSERT INTO counters (courier, zone, day, delivered, outtat) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (courier, zone, day) DO UPDATE SET
+            delivered = delivered + excluded.delivered,
+            outtat = outtat + excluded.outtat
+        """,
+        delta.astype({"delivered": int, "outtat": int}).itertuples(index=False, name=None)
+    )
+
+    connection.executemany(
+        "DELETE FROM orders WHERE key = ?",
+        ((int(key),) for key in removed["key"])
+    )
+    connection.executemany(
+        "INSERT OR REPLACE INTO orders (key, row_hash, courier, zone, day, delivered, outtat) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        added.astype({"key": int, "row_hash": int, "delivered": int, "outtat": int})
+        .itertuples(index=False, name=None)
+    )
+
+    return delta
+
+
+# ---------------- EVALUATION ----------------
+def scope_rates(connection, scope, cells):
+    # Delivered / Out-TAT totals for the touched (name, day) cells of one scope
+    rates = []
+    for name, day in cells:
+        delivered, outtat = connection.execute(
+            f"SELECT COALESCE(SUM(delivered), 0), COALESCE(SUM(outtat), 0) "
+            f"FROM counters WHERE {scope} = ? AND day = ?",
+            (name, day)
+        ).fetchone()
+        rates.append((name, day, delivered, outtat))
+    return rates
+
+
+def evaluate_cells(connection, delta, threshold, min_delivered):
+    detected_at = datetime.now().isoformat(timespec="seconds")
+    events = []
+
+    for scope in SCOPES:
+        touched = delta.loc[delta["day"] != "", [scope, "day"]].drop_duplicates()
+        touched = touched[touched[scope] != ""]
+
+        for name, day, delivered, outtat in scope_rates(connection, scope, touched.itertuples(index=False)):
+            rate = outtat / delivered if delivered else 0.0
+            breached = delivered >= min_delivered and rate > threshold
+
+            was_breached = connection.execute(
+                "SELECT 1 FROM breaches WHERE scope = ? AND name = ? AND day = ?",
+                (scope, name, day)
+            ).fetchone() is not None
+
+            if breached and was_breached:
+                # Still open: keep the stored rate current
+                connection.execute(
+                    "UPDATE breaches SET outtat_rate = ? WHERE scope = ? AND name = ? AND day = ?",
+                    (rate, scope, name, day)
+                )
+                continue
+
+            if breached == was_breached:
+                continue
+
+            if breached:
+                connection.execute(
+                    "INSERT INTO breaches (scope, name, day, outtat_rate) VALUES (?, ?, ?, ?)",
+                    (scope, name, day, rate)
+                )
+            else:
+                connection.execute(
+                    "DELETE FROM breaches WHERE scope = ? AND name = ? AND day = ?",
+                    (scope, name, day)
+                )
+
+            events.append({
+                "event": "breach" if breached else "recovered",
+                "scope": scope,
+                "name": name,
+                "day": day,
+                "delivered": int(delivered),
+                "outtat": int(outtat),
+                "outtat_rate": round(rate, 4),
+                "threshold": threshold,
+                "detected_at": detected_at,
+            })
+
+    return events
+
+
+# ---------------- SINKS ----------------
+def write_events(events, path=EVENTS_FILE):
+    with open(path, "a", encoding="utf-8") as handle:
+        for event in events:
+            handle.write(json.dumps(event) + "\n")
+
+
+def post_events(events, url, timeout=WEBHOOK_TIMEOUT):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({"events": events}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status
+
+
+# ---------------- ONE ETL RUN ----------------
+def process_run(df, state_file=STATE_FILE, events_file=EVENTS_FILE, webhook=None,
+                threshold=OUTTAT_THRESHOLD, min_delivered=MIN_DELIVERED):
+    keys = order_keys(df)
+    hashes = row_hashes(df)
+
+    sidecar = sidecar_path(state_file)
+
+    with open_store(state_file) as connection:
+        previous = stored_hashes(connection, sidecar)
+
+        # New or changed rows: key unseen, or seen with another hash
+        position = previous.index.get_indexer(keys)
+        known = position >= 0
+        stored = np.append(previous.to_numpy(), 0)[position]  # -1 hits the padding
+        changed = np.flatnonzero(~known | (stored != hashes))
+
+        gone = previous.index[~previous.index.isin(keys)].to_numpy()
+        replaced = keys[changed][known[changed]]
+
+        added = contributions(df.iloc[changed], keys[changed], hashes[changed])
+        removed = stored_contributions(connection, np.concatenate([gone, replaced]))
+
+        delta = apply_delta(connection, added, removed)
+        events = evaluate_cells(connection, delta, threshold, min_delivered)
+
+        generation = store_generation(connection) + 1
+        connection.execute(f"PRAGMA user_version = {generation}")
+
+    connection.close()
+
+    # After this run the store holds exactly this run's rows
+    save_hashes(sidecar, generation, keys, hashes)
+
+    if events:
+        write_events(events, events_file)
+        if webhook:
+            try:
+                post_events(events, webhook)
+            except OSError as error:
+                print("Alert webhook failed:", error)
+
+    return {
+        "rows": len(df),
+        "changed": len(changed),
+        "removed": len(gone),
+        "events": events,
+    }
@@ -0,0 +1,291 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import kpi_index
+import metrics
+from encoding import encode_orders
+from parallel import sharded_aggregator
+from schema import APP_COLUMNS, INT_COLUMNS, OUTPUT_FILE, load_output_report
+
+# Local JSON API over the KPI / pivot engine. One encoded dataset is shared
+# by every request thread and reloaded when Output_Report.csv changes;
+# responses are cached per (endpoint, filters, data version) and carry an
+# ETag, so unchanged results revalidate with a 304 and no body.
+
+# ---------------- CONFIG ----------------
+API_HOST = "127.0.0.1"
+API_PORT = 8502
+API_COLUMNS = list(dict.fromkeys(APP_COLUMNS + INT_COLUMNS))
+RESPONSE_CACHE_SIZE = 256
+
+# Query parameter -> filter_rows keyword; repeat a parameter for several values
+LIST_FILTERS = {
+    "facility": "facility",
+    "courier": "courier",
+    "zone": "zone",
+    "status": "status",
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ---------------- DATASET ----------------
+def data_version(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class Generation:
+    # One loaded version of the file and the requests still using it
+
+    def __init__(self, version, orders, index):
+        self.version = version
+        self.orders = orders
+        self.index = index
+        self.users = 0
+        self.retired = False
+        self.closed = False
+
+    def idle(self):
+        return self.retired and self.users == 0 and not self.closed
+
+
+class Dataset:
+
+    def __init__(self, path=OUTPUT_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.generation = None
+
+    def load(self, version):
+        df = load_output_report(self.path, API_COLUMNS)
+        orders = encode_orders(df, dimensions=list(df.columns))
+        orders.aggregator = sharded_aggregator(orders)
+        return Generation(version, orders, kpi_index.build_index(orders))
+
+    @contextmanager
+    def current(self):
+        # (version, orders, index), reloaded once per change of the file. A
+        # replaced generation keeps its aggregator until its last request ends
+        version = data_version(self.path)
+        with self.lock:
+            retired = self.generation
+            if retired is None or version != retired.version:
+                self.generation = self.load(version)
+                if retired is not None:
+                    retired.retired = True
+            else:
+                retired = None
+            generation = self.generation
+            generation.users += 1
+
+        try:
+            yield generation.version, generation.orders, generation.index
+        finally:
+            with self.lock:
+                generation.users -= 1
+                idle = [gen for gen in (generation, retired) if gen is not None and gen.idle()]
+                for gen in idle:
+                    gen.closed = True
+            for gen in idle:
+                if gen.orders.aggregator is not None:
+                    gen.orders.aggregator.close()
+
+
+# ---------------- REQUEST PARSING ----------------
+def parse_day(params, name):
+    values = params.get(name)
+    if not values:
+        return None
+    try:
+        return date.fromisoformat(values[-1])
+    except ValueError:
+        raise BadRequest(f"{name} must be YYYY-MM-DD")
+
+
+def parse_filters(params):
+    start, end = parse_day(params, "start"), parse_day(params, "end")
+    if (start is None) != (end is None):
+        raise BadRequest("start and end go together")
+
+    filters = {keyword: params.get(name, []) for name, keyword in LIST_FILTERS.items()}
+    filters["date_range"] = (start, end) if start else None
+    return filters
+
+
+def canonical_query(params):
+    # Same request, same cache entry, whatever the parameter order
+    return tuple(sorted((name, tuple(values)) for name, values in params.items()))
+
+
+# ---------------- ENDPOINTS ----------------
+def records(frame):
+    # Pivot rows as JSON-safe dicts (NaN / NA become null)
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records")
+
+
+def kpis_endpoint(orders, index, filters, params):
+    if index is not None:
+        kpis = index.kpis(**filters)
+    else:
+        kpis = metrics.compute_kpis(orders, metrics.filter_rows(orders, **filters))
+
+    shares = {
+        name: metrics.pct(kpis[name], kpis[whole]) for name, whole in metrics.KPI_SHARES.items()
+    }
+    return {"kpis": kpis, "shares_pct": shares}
+
+
+def tat_pivot_endpoint(orders, index, filters, params):
+    tat_types = metrics.tat_types(orders)
+    tat_type = params.get("tat", ["Placed to Delivery TAT"])[-1]
+    if tat_type not in tat_types:
+        raise BadRequest(f"tat must be one of {list(tat_types)}")
+
+    pivot_column = params.get("pivot", ["Zone"])[-1]
+    if pivot_column not in orders.codes:
+        raise BadRequest(f"pivot must be one of {sorted(orders.codes)}")
+
+    rows = metrics.filter_rows(orders, **filters)
+    pivot = metrics.tat_pivot(orders, rows, pivot_column, tat_types[tat_type])
+    return {"tat": tat_type, "pivot": pivot_column, "rows": records(pivot)}
+
+
+def dispatch_pivot_endpoint(orders, index, filters, params):
+    rows = metrics.filter_rows(orders, **filters)
+    return {"rows": records(metrics.dispatch_pivot(orders, rows))}
+
+
+def zone_pivot_endpoint(orders, index, filters, params):
+    rows = metrics.filter_rows(orders, **filters)
+    return {"rows": records(metrics.zone_pivot(orders, rows))}
+
+
+ENDPOINTS = {
+    "/kpis": kpis_endpoint,
+    "/tat_pivot": tat_pivot_endpoint,
+    "/dispatch_pivot": dispatch_pivot_endpoint,
+    "/zone_pivot": zone_pivot_endpoint,
+}
+
+
+# ---------------- RESPONSE CACHE ----------------
+class ResponseCache:
+
+    def __init__(self, size=RESPONSE_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, body):
+        entry = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return entry
+
+
+# ---------------- SERVER ----------------
+class ApiHandler(BaseHTTPRequestHandler):
+    dataset = None
+    cache = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = ENDPOINTS.get(url.path.rstrip("/") or "/")
+        if endpoint is None:
+            return self.send_json(404, {"error": f"unknown endpoint, try {sorted(ENDPOINTS)}"})
+
+        params = parse_qs(url.query)
+        try:
+            filters = parse_filters(params)
+            with self.dataset.current() as (version, orders, index):
+                key = (url.path, canonical_query(params), version)
+                entry = self.cache.get(key)
+                if entry is None:
+                    payload = endpoint(orders, index, filters, params)
+                    entry = self.cache.put(key, json.dumps(payload, default=str).encode("utf-8"))
+        except BadRequest as error:
+            return self.send_json(400, {"error": str(error)})
+        except FileNotFoundError:
+            return self.send_json(503, {"error": f"{self.dataset.path} not found"})
+        except Exception as error:
+            # The client gets a JSON error, not a dropped connection
+            traceback.print_exc()
+            return self.send_json(500, {"error": f"internal error: {type(error).__name__}"})
+
+        etag, body = entry
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host=API_HOST, port=API_PORT, path=OUTPUT_FILE):
+    handler = type("Handler", (ApiHandler,), {
+        "dataset": Dataset(path),
+        "cache": ResponseCache(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON API over the KPI and pivot engine")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--input", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.input)
+    # Load once up front so the first caller does not wait for it
+    with server.RequestHandlerClass.dataset.current():
+        pass
+    print(f"Serving {sorted(ENDPOINTS)} on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+#python api.py --port 8502
+#curl "http://127.0.0.1:8502/kpis?start=2025-03-01&end=2025-03-31&zone=a&zone=e"
+#curl "http://127.0.0.1:8502/tat_pivot?tat=Pickup+to+Delivery+TAT&pivot=Facility"
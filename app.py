@@ -1,6 +1,18 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+import charts
+import drilldown
+import kpi_index
+import metrics
+import sampling
+from encoding import encode_orders
+from metrics import pct
+from parallel import sharded_aggregator
+from render_profiler import RenderProfiler
+from schema import APP_COLUMNS, OUTPUT_FILE, load_output_report, load_pincode_master
 
 # ---------------- PAGE CONFIG ----------------
 st.set_page_config(
@@ -11,35 +23,49 @@ st.set_page_config(
 # ---------------- LOAD DATA ----------------
 @st.cache_data
 def load_data():
-    df = pd.read_csv("Output_Report.csv")
-
-    date_columns = [
-        "Devx Order Date (Date)",
-        "UC Order Date (Date)",
-        "Dispatch Date (Date)",
-        "Pickup Date (Date)",
-        "Delivery Date (Date)",
-        "Assigned Date_D"
-    ]
+    # Only the columns the dashboard uses, with categorical / Int32 / datetime dtypes
+    return load_output_report(OUTPUT_FILE, APP_COLUMNS)
 
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True)
+@st.cache_resource
+def load_full_report():
+    # Every report column, read only when the preview asks for it
+    return load_output_report(OUTPUT_FILE)
 
-    return df
+@st.cache_data
+def load_pincode():
+    return load_pincode_master()
+
+@st.cache_resource
+def section_pool():
+    # One worker pool shared by every session; workers only run metrics.*
+    return ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="section")
+
+@st.cache_resource(on_release=lambda orders: orders.aggregator and orders.aggregator.close())
+def load_orders():
+    # Dictionary-encoded codes / day numbers / packed flags, shared across sessions
+    orders = encode_orders(load_data())
+    # Counts on very large data are sharded by Facility over a process pool
+    orders.aggregator = sharded_aggregator(orders)
+    return orders
+
+@st.cache_resource
+def load_kpi_index():
+    # Per-day cumulative KPI counts; None when too large (KPIs then scan rows)
+    return kpi_index.build_index(load_orders())
+
+@st.cache_resource
+def load_sample():
+    # Stratified sample indexes for the fast preview, drawn once per data load
+    return sampling.stratified_sample(load_orders())
 
 df = load_data()
+orders = load_orders()
+kpi_idx = load_kpi_index()
+sample = load_sample()
 
 # ---------------- DERIVED COLUMNS ----------------
-if "Reshipped" in df.columns:
-    df["Reshipped_Flag"] = (
-        df["Reshipped"]
-        .fillna("")
-        .astype(str)
-        .str.strip()
-        .str.lower()
-        .isin(["yes", "y", "true", "1", "reshipped"])
-    )
+if "Reshipped_Flag" in orders.bits:
+    df["Reshipped_Flag"] = orders.flag("Reshipped_Flag")
 else:
     df["Reshipped_Flag"] = False
 
@@ -76,654 +102,448 @@ status_filter = st.sidebar.multiselect(
     sorted(df["Final Status"].dropna().unique())
 )
 
-
-# ---------------- APPLY FILTERS ----------------
-filtered_df = df.copy()
-
-if date_range:
-    filtered_df = filtered_df[
-        (filtered_df["UC Order Date (Date)"] >= pd.to_datetime(date_range[0])) &
-        (filtered_df["UC Order Date (Date)"] <= pd.to_datetime(date_range[1]))
-    ]
-
-if facility_filter:
-    filtered_df = filtered_df[filtered_df["Facility"].isin(facility_filter)]
-
-if courier_filter:
-    filtered_df = filtered_df[filtered_df["Shipping Courier"].isin(courier_filter)]
-
-if zone_filter:
-    filtered_df = filtered_df[filtered_df["Zone"].isin(zone_filter)]
-    
-if status_filter:
-    filtered_df = filtered_df[filtered_df["Final Status"].isin(status_filter)]
-
-
-# ---------------- KPI CALCULATIONS ----------------
-reshipped_orders = filtered_df["Reshipped_Flag"].sum()
-
-final_status = (
-    filtered_df["Final Status"]
-    .astype(str)
-    .str.strip()
-    .str.lower()
+fast_preview = st.sidebar.checkbox(
+    "Fast preview (sampled estimates first)",
+    value=False,
+    help="Show KPI and trend estimates with 95% confidence intervals from a "
+         "stratified sample, then replace them with exact figures"
 )
 
-is_delivered = final_status.eq("delivered")
-is_rto = final_status.eq("rto")
-is_intransit = final_status.str.startswith("in-transit")
-
-total_orders = len(filtered_df)
-delivered_orders = is_delivered.sum()
-rto_orders = is_rto.sum()
-intransit_orders = is_intransit.sum()
-
-def pct(part, whole):
-    return round((part / whole) * 100, 1) if whole > 0 else 0
-
-# Delivered SLA
-delivered_in_tat = (
-    filtered_df.loc[is_delivered, "Placed to Delivery TAT Status"]
-    .astype(str)
-    .str.lower()
-    .eq("intat")
-    .sum()
+compare_previous = st.sidebar.checkbox(
+    "Compare with previous period",
+    value=False,
+    help="Show each KPI's change against the same number of days just before the selected range"
 )
 
-delivered_out_tat = (
-    filtered_df.loc[is_delivered, "Placed to Delivery TAT Status"]
-    .astype(str)
-    .str.lower()
-    .eq("outtat")
-    .sum()
-)
+st.sidebar.divider()
+show_profiler = st.sidebar.checkbox("Render profiler (debug)", value=False)
 
-# In-Transit SLA (Pickup → Delivery)
-intransit_in_tat = (
-    filtered_df.loc[is_intransit, "Pickup to Delivery TAT Status"]
-    .astype(str)
-    .str.lower()
-    .eq("intat")
-    .sum()
-)
 
-intransit_out_tat = (
-    filtered_df.loc[is_intransit, "Pickup to Delivery TAT Status"]
-    .astype(str)
-    .str.lower()
-    .eq("outtat")
-    .sum()
+# ---------------- APPLY FILTERS ----------------
+# Filters run on the encoded codes; the frame is sliced once the KPIs are out
+filters = dict(
+    date_range=date_range,
+    facility=facility_filter,
+    courier=courier_filter,
+    zone=zone_filter,
+    status=status_filter
+)
+
+row_mask = metrics.filter_rows(orders, **filters)
+
+# Same filters over the sampled rows only
+if fast_preview:
+    sample_mask = metrics.filter_rows(sample.orders, **filters)
+
+# Section results are reused until the data file or a filter changes
+profiler = RenderProfiler(
+    enabled=show_profiler,
+    state_key=(
+        os.path.getmtime(OUTPUT_FILE),
+        tuple(str(day) for day in date_range),
+        tuple(facility_filter),
+        tuple(courier_filter),
+        tuple(zone_filter),
+        tuple(status_filter)
+    )
 )
 
+
 def green(text):
     return f"<span style='color:#2ecc71; font-weight:600'>{text}</span>"
 
+def show_kpi(column, title, part, whole=None, delta=None):
+    column.markdown(f"### {title}")
+    text = f"{part}" if whole is None else f"{part} ({pct(part, whole)}%)"
+    column.markdown(green(text), unsafe_allow_html=True)
+    if delta is not None:
+        count_change, share_change = delta
+        change = f"{count_change:+} vs previous period"
+        if share_change is not None:
+            change += f" ({share_change:+.1f} pp)"
+        column.caption(change)
+
+def show_estimate(column, title, estimate):
+    count, count_ci, share, share_ci = estimate
+    column.markdown(f"### {title}")
+    text = f"≈{count} ± {count_ci}"
+    if share is not None:
+        text += f" ({share}% ± {share_ci})"
+    column.markdown(green(text), unsafe_allow_html=True)
+
+
+KPI_COLUMNS = [
+    # ---------------- Column 1: Overall ----------------
+    [("Total Orders", "total_orders"), ("RTO", "rto_orders"), ("Reshipped", "reshipped_orders")],
+    # ---------------- Column 2: Delivered ----------------
+    [("Delivered", "delivered_orders"), ("Delivered In-TAT", "delivered_in_tat"),
+     ("Delivered Out-TAT", "delivered_out_tat"), ("Delivered E2E In-TAT", "delivered_e2e_in_tat")],
+    # ---------------- Column 3: In-Transit ----------------
+    [("In-Transit", "intransit_orders"), ("In-Transit In-TAT", "intransit_in_tat"),
+     ("In-Transit Out-TAT", "intransit_out_tat")],
+]
 
-# ---------------- DASHBOARD HEADER ----------------
-st.title("Order Operations Dashboard")
-
-c1, c2, c3 = st.columns(3)
-
-# ---------------- Column 1: Overall ----------------
-c1.markdown("### Total Orders")
-c1.markdown(green(f"{total_orders}"), unsafe_allow_html=True)
-
-c1.markdown("### RTO")
-c1.markdown(
-    green(f"{rto_orders} ({pct(rto_orders, total_orders)}%)"),
-    unsafe_allow_html=True
-)
+def show_kpis(kpis, deltas=None):
+    for column, cells in zip(st.columns(3), KPI_COLUMNS):
+        for title, name in cells:
+            whole = metrics.KPI_SHARES.get(name)
+            show_kpi(
+                column, title, kpis[name], kpis[whole] if whole else None,
+                deltas[name] if deltas else None
+            )
 
-c1.markdown("### Reshipped")
-c1.markdown(
-    green(f"{reshipped_orders} ({pct(reshipped_orders, total_orders)}%)"),
-    unsafe_allow_html=True
-)
+def show_estimates(estimates):
+    for column, cells in zip(st.columns(3), KPI_COLUMNS):
+        for title, name in cells:
+            show_estimate(column, title, estimates[name])
 
 
-# ---------------- Column 2: Delivered ----------------
-c2.markdown("### Delivered")
-c2.markdown(
-    green(f"{delivered_orders} ({pct(delivered_orders, total_orders)}%)"),
-    unsafe_allow_html=True
-)
-
-c2.markdown("### Delivered In-TAT")
-c2.markdown(
-    green(f"{delivered_in_tat} ({pct(delivered_in_tat, delivered_orders)}%)"),
-    unsafe_allow_html=True
-)
+# ---------------- DASHBOARD HEADER ----------------
+st.title("Order Operations Dashboard")
 
-c2.markdown("### Delivered Out-TAT")
-c2.markdown(
-    green(f"{delivered_out_tat} ({pct(delivered_out_tat, delivered_orders)}%)"),
-    unsafe_allow_html=True
-)
+kpi_slot = st.empty()
+preview_note = st.empty()
 
+if fast_preview:
+    with profiler.section("KPI Preview") as section:
+        estimates = section.aggregate(sampling.estimate_kpis, sample, sample_mask)
 
-# ---------------- Column 3: In-Transit ----------------
-c3.markdown("### In-Transit")
-c3.markdown(
-    green(f"{intransit_orders} ({pct(intransit_orders, total_orders)}%)"),
-    unsafe_allow_html=True
-)
+        with kpi_slot.container():
+            show_estimates(estimates)
 
-c3.markdown("### In-Transit In-TAT")
-c3.markdown(
-    green(f"{intransit_in_tat} ({pct(intransit_in_tat, intransit_orders)}%)"),
-    unsafe_allow_html=True
-)
+        preview_note.caption(
+            f"Estimated from a {sample.fraction:.0%} sample stratified by Zone × Shipping provider "
+            "(95% confidence intervals); exact figures follow."
+        )
 
-c3.markdown("### In-Transit Out-TAT")
-c3.markdown(
-    green(f"{intransit_out_tat} ({pct(intransit_out_tat, intransit_orders)}%)"),
-    unsafe_allow_html=True
-)
+def exact_kpis(filters):
+    # Two cumulative lookups per selected index group; row scan without an index
+    if kpi_idx is not None:
+        return kpi_idx.kpis(**filters)
+    return metrics.compute_kpis(orders, metrics.filter_rows(orders, **filters))
+
+# Previous period of the same length, only with a complete date range
+previous_range = None
+if compare_previous and len(date_range) == 2:
+    previous_range = kpi_index.previous_period(date_range)
+
+def previous_kpis(filters):
+    return exact_kpis({**filters, "date_range": previous_range})
+
+with profiler.section("KPIs") as section:
+    if kpi_idx is not None:
+        kpis = section.aggregate(exact_kpis, filters)
+    else:
+        kpis = section.aggregate(metrics.compute_kpis, orders, row_mask)
+
+    deltas = None
+    if previous_range:
+        previous = section.aggregate(previous_kpis, filters)
+        deltas = kpi_index.kpi_deltas(kpis, previous)
+
+    # Same layout as the estimates, so each value is replaced in place
+    with kpi_slot.container():
+        show_kpis(kpis, deltas)
+        if previous_range:
+            st.caption(
+                f"Changes against {previous_range[0]:%d-%m-%Y} – {previous_range[1]:%d-%m-%Y}"
+            )
+    preview_note.empty()
 
 
 st.divider()
 
-@st.cache_data
-def load_pincode():
-    df = pd.read_csv("pincode.csv")
-
-    # Rename columns to match app expectations
-    df = df.rename(columns={
-        "Pincode": "pincode",
-        "Latitude": "latitude",
-        "Longitude": "longitude"
-    })
-
-    # 🔴 CRITICAL FIX: force numeric conversion
-    df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
-    df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
-
-    return df
-
 # ---------------- EXECUTIVE SUMMARY LINE ----------------
-
-# Overall Delivered SLA
-overall_intat_pct = pct(delivered_in_tat, delivered_orders)
-
-# Zone risk (Delivered orders only)
-zone_risk = (
-    filtered_df[filtered_df["Final Status"].str.lower() == "delivered"]
-    .groupby("Zone")
-    .agg(
-        total=("Placed to Delivery TAT Status", "count"),
-        outtat=("Placed to Delivery TAT Status",
-                lambda x: (x.str.lower() == "outtat").sum())
+with profiler.section("Executive Summary") as section:
+    summary = section.aggregate(metrics.executive_summary, orders, row_mask, kpis)
+
+    # Render summary line
+    st.markdown(
+        f"""
+        **📌 Overall Delivery SLA:** {summary["overall_intat_pct"]}% In-TAT  
+        | **Biggest Risk:** {summary["worst_zone"]} Zone ({summary["worst_zone_pct"]}% Out-TAT)  
+        | **Worst Courier:** {summary["worst_courier"]}
+        """
     )
-    .reset_index()
-)
 
-zone_risk["outtat_pct"] = (zone_risk["outtat"] / zone_risk["total"] * 100).round(1)
-
-worst_zone_row = zone_risk.sort_values("outtat_pct", ascending=False).iloc[0]
-worst_zone = worst_zone_row["Zone"]
-worst_zone_pct = worst_zone_row["outtat_pct"]
-
-# Courier risk (Delivered orders only)
-courier_risk = (
-    filtered_df[filtered_df["Final Status"].str.lower() == "delivered"]
-    .groupby("Shipping Courier")
-    .agg(
-        total=("Placed to Delivery TAT Status", "count"),
-        outtat=("Placed to Delivery TAT Status",
-                lambda x: (x.str.lower() == "outtat").sum())
+# ---------------- DRILL-DOWN ----------------
+# filtered_df split once per column and filter state; a selectbox change
+# only gathers the chosen group's rows
+def drilldown_by(section, col):
+    return section.aggregate(drilldown.partition, filtered_df, col, key=col, shared=True)
+
+
+# ---------------- SECTIONS ----------------
+# One function per section; each renders into whatever container is active
+def show_trend(section, trend_agg):
+    st.subheader("Delivered In-TAT Trend")
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.trend_figure, trend_agg),
+        use_container_width=True
     )
-    .reset_index()
-)
 
-courier_risk["outtat_pct"] = (
-    courier_risk["outtat"] / courier_risk["total"] * 100
-).round(1)
-
-worst_courier = courier_risk.sort_values(
-    "outtat_pct", ascending=False
-).iloc[0]["Shipping Courier"]
-
-# Render summary line
-st.markdown(
-    f"""
-    **📌 Overall Delivery SLA:** {overall_intat_pct}% In-TAT  
-    | **Biggest Risk:** {worst_zone} Zone ({worst_zone_pct}% Out-TAT)  
-    | **Worst Courier:** {worst_courier}
-    """
-)
+def trend_section(section):
+    show_trend(section, section.aggregate(metrics.trend_agg, filtered_df))
 
-# ---------------- DELIVERED IN-TAT TREND ----------------
 
-trend_df = filtered_df[
-    filtered_df["Final Status"].str.lower() == "delivered"
-].copy()
+# ---------------- ORDER DENSITY MAP ----------------
+def density_map_section(section):
+    st.subheader("Order Density by Pincode")
 
-trend_df["order_date"] = trend_df["UC Order Date (Date)"].dt.date
+    map_df = section.aggregate(metrics.pincode_density, filtered_df, pincode_master)
 
-trend_agg = (
-    trend_df
-    .groupby("order_date")
-    .agg(
-        delivered_orders=("Placed to Delivery TAT Status", "count"),
-        delivered_intat=("Placed to Delivery TAT Status",
-                          lambda x: (x.str.lower() == "intat").sum())
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.density_map_figure, map_df),
+        use_container_width=True
     )
-    .reset_index()
-)
-
-trend_agg["Delivered In-TAT %"] = (
-    trend_agg["delivered_intat"] / trend_agg["delivered_orders"] * 100
-).round(1)
-
-st.subheader("Delivered In-TAT Trend")
-
-trend_fig = px.line(
-    trend_agg,
-    x="order_date",
-    y="Delivered In-TAT %",
-    markers=True,
-    title="Delivered In-TAT % Over Time"
-)
-
-trend_fig.update_traces(
-    line=dict(width=3),
-    hovertemplate="Date: %{x}<br>In-TAT: %{y}%<extra></extra>"
-)
-
-trend_fig.update_layout(
-    yaxis=dict(range=[80, 100]),
-    margin={"r":0,"t":40,"l":0,"b":0}
-)
-
-# Optional SLA target line (recommended)
-trend_fig.add_hline(
-    y=95,
-    line_dash="dash",
-    annotation_text="Target: 95%",
-    annotation_position="top left"
-)
 
-st.plotly_chart(trend_fig, use_container_width=True)
 
+def sla_split_section(section):
+    st.subheader("SLA Split (Delivered vs In-Transit)")
 
-pincode_master = load_pincode()
-
-map_df_base = filtered_df.merge(
-    pincode_master,
-    left_on="Order Pincode",
-    right_on="pincode",
-    how="left"
-)
-
-
-st.subheader("Order Density by Pincode")
-
-map_df = (
-    map_df_base
-    .dropna(subset=["latitude", "longitude"])
-    .groupby(["Order Pincode", "latitude", "longitude"])
-    .size()
-    .reset_index(name="Orders")
-)
-
-fig = px.scatter_mapbox(
-    map_df,
-    lat="latitude",
-    lon="longitude",
-    size="Orders",
-    color="Orders",
-    color_continuous_scale="Blues_r",
-    zoom=4,
-    hover_name="Order Pincode",
-    title="Order Density Map"
-)
-
-fig.update_layout(
-    mapbox_style="open-street-map",
-    mapbox=dict(
-        center=dict(lat=22.9734, lon=78.6569),  # 🇮🇳 India center
-        zoom=4.2,
-        bounds=dict(
-            west=68.0,
-            east=97.5,
-            south=6.0,
-            north=36.5
-        )
-    ),
-    margin={"r":0,"t":40,"l":0,"b":0}
-)
-
-
-st.plotly_chart(fig, use_container_width=True)
-
-
-st.subheader("SLA Split (Delivered vs In-Transit)")
-
-status_choice = st.radio(
-    "Select Order Type",
-    ["Delivered", "In-Transit"],
-    horizontal=True
-)
-
-if status_choice == "Delivered":
-    sla_df = filtered_df[filtered_df["Final Status"].str.lower() == "delivered"]
-else:
-    sla_df = filtered_df[
-        filtered_df["Final Status"].str.lower().str.startswith("in-transit")
-    ]
-
-status_col = (
-    "Placed to Delivery TAT Status"
-    if status_choice == "Delivered"
-    else "Placed to Delivery TAT Status"
-)
-
-sla_split = (
-    sla_df
-    .groupby(status_col)
-    .size()
-    .reset_index(name="Count")
-)
-
+    status_choice = st.radio(
+        "Select Order Type",
+        ["Delivered", "In-Transit"],
+        horizontal=True
+    )
 
-sla_pie = px.pie(
-    sla_split,
-    names="Placed to Delivery TAT Status",
-    values="Count",
-    title=f"{status_choice} SLA Split"
-)
+    sla_split = section.aggregate(
+        metrics.sla_split, filtered_df, status_choice, key=status_choice
+    )
 
-st.plotly_chart(sla_pie, use_container_width=True)
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.sla_pie_figure, sla_split, status_choice),
+        use_container_width=True
+    )
 
 
 # ---------------- STATUS DISTRIBUTION ----------------
-st.subheader("Final Order Status Distribution")
+def status_section(section):
+    st.subheader("Final Order Status Distribution")
 
-status_fig = px.pie(
-    filtered_df,
-    names="Final Status",
-    title="Order Final Status Split"
-)
-
-st.plotly_chart(status_fig, use_container_width=True)
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.status_pie_figure, filtered_df),
+        use_container_width=True
+    )
 
 # ---------------- Dispatch Performance ----------------
-st.subheader("Dispatch Performance")
-
-dispatch_agg = (
-    filtered_df
-    .groupby(["Facility", "Dispatch TAT Status"])
-    .size()
-    .reset_index(name="Count")
-)
-
-dispatch_agg["Percentage"] = (
-    dispatch_agg["Count"] /
-    dispatch_agg.groupby("Facility")["Count"].transform("sum") * 100
-).round(1)
-
-dispatch_fig = px.bar(
-    dispatch_agg,
-    x="Facility",
-    y="Count",
-    color="Dispatch TAT Status",
-    text=dispatch_agg["Percentage"].astype(str) + "%",
-    title="Dispatch TAT by Facility"
-)
+def dispatch_section(section):
+    st.subheader("Dispatch Performance")
 
-dispatch_fig.update_traces(
-    hovertemplate="Count: %{y}<extra></extra>"
-)
+    dispatch_agg = section.aggregate(metrics.dispatch_agg, filtered_df)
 
-st.plotly_chart(dispatch_fig, use_container_width=True)
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.dispatch_figure, dispatch_agg),
+        use_container_width=True
+    )
 
 # ---------------- DELIVERY PERFORMANCE ----------------
-st.subheader("Delivery Performance")
+def delivery_section(section):
+    st.subheader("Delivery Performance")
 
-delivery_agg = (
-    filtered_df[filtered_df["Final Status"].str.lower() == "delivered"]
-    .groupby(["Zone", "Placed to Delivery TAT Status"])
-    .size()
-    .reset_index(name="Count")
-)
-
-delivery_agg["Percentage"] = (
-    delivery_agg["Count"] /
-    delivery_agg.groupby("Zone")["Count"].transform("sum") * 100
-).round(1)
-
-delivery_fig = px.bar(
-    delivery_agg,
-    x="Zone",
-    y="Count",
-    color="Placed to Delivery TAT Status",
-    text=delivery_agg["Percentage"].astype(str) + "%",
-    title="Placed to Delivery TAT by Zone"
-)
-
-delivery_fig.update_traces(
-    hovertemplate="Count: %{y}<extra></extra>"
-)
-
-st.plotly_chart(delivery_fig, use_container_width=True)
+    delivery_agg = section.aggregate(metrics.delivery_agg, filtered_df)
 
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.delivery_figure, delivery_agg),
+        use_container_width=True
+    )
 
 
 # ---------------- CONSUMER FACING DELIVERY PERFORMANCE ----------------
-st.subheader("Consumer Facing Delivery Performance (Delivered Orders Only)")
-
-consumer_delivery_df = filtered_df[
-    filtered_df["Final Status"].astype(str).str.lower() == "delivered"
-]
-
-consumer_delivery_agg = (
-    consumer_delivery_df
-    .groupby(["Zone", "Consumer to Delivery TAT Status"])
-    .size()
-    .reset_index(name="Count")
-)
-
-consumer_delivery_agg["Percentage"] = (
-    consumer_delivery_agg["Count"] /
-    consumer_delivery_agg.groupby("Zone")["Count"].transform("sum") * 100
-).round(1)
-
-consumer_delivery_fig = px.bar(
-    consumer_delivery_agg,
-    x="Zone",
-    y="Count",
-    color="Consumer to Delivery TAT Status",
-    text=consumer_delivery_agg["Percentage"].astype(str) + "%",
-    title="Consumer Facing Placed to Delivery TAT (Delivered Orders)"
-)
+def consumer_delivery_section(section):
+    st.subheader("Consumer Facing Delivery Performance (Delivered Orders Only)")
 
-consumer_delivery_fig.update_traces(
-    hovertemplate="Count: %{y}<extra></extra>"
-)
+    consumer_delivery_agg = section.aggregate(metrics.consumer_delivery_agg, filtered_df)
 
-st.plotly_chart(consumer_delivery_fig, use_container_width=True)
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.consumer_delivery_figure, consumer_delivery_agg),
+        use_container_width=True
+    )
 
 # ---------------- IN-TRANSIT SLA PERFORMANCE ----------------
-st.subheader("In-Transit SLA Performance")
-
-intransit_df = filtered_df[
-    filtered_df["Final Status"].str.lower().str.startswith("in-transit")
-]
+def intransit_section(section):
+    st.subheader("In-Transit SLA Performance")
 
-intransit_agg = (
-    intransit_df
-    .groupby("Pickup to Delivery TAT Status")
-    .size()
-    .reset_index(name="Count")
-)
-
-intransit_agg["Percentage"] = (
-    intransit_agg["Count"] / intransit_agg["Count"].sum() * 100
-).round(1)
-
-intransit_fig = px.bar(
-    intransit_agg,
-    x="Pickup to Delivery TAT Status",
-    y="Count",
-    text=intransit_agg["Percentage"].astype(str) + "%",
-    title="In-Transit Orders SLA Status (Pickup to Delivery)"
-)
-
-intransit_fig.update_traces(
-    hovertemplate="Count: %{y}<extra></extra>"
-)
-
-st.plotly_chart(intransit_fig, use_container_width=True)
+    intransit_agg = section.aggregate(metrics.intransit_agg, filtered_df)
 
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.intransit_figure, intransit_agg),
+        use_container_width=True
+    )
 
 
 # ---------------- SHIPPING PROVIDER PERFORMANCE ----------------
-st.subheader("Shipping Provider Load Distribution")
-
-provider_perf = (
-    filtered_df
-    .groupby("Shipping provider")
-    .size()
-    .reset_index(name="Count")
-)
+def provider_load_section(section):
+    st.subheader("Shipping Provider Load Distribution")
 
-provider_fig = px.pie(
-    provider_perf,
-    names="Shipping provider",
-    values="Count",
-    title="Orders by Shipping Provider",
-    hole=0.4
-)
-
-provider_fig.update_traces(
-    hovertemplate="Provider: %{label}<br>Orders: %{value}<extra></extra>"
-)
-
-selected_provider = st.plotly_chart(
-    provider_fig,
-    use_container_width=True
-)
+    provider_perf = section.aggregate(metrics.provider_perf, filtered_df)
 
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.provider_pie_figure, provider_perf),
+        use_container_width=True
+    )
 
-st.subheader("Shipping Provider SLA Performance")
+    return provider_perf
 
-provider_sla = (
-    filtered_df
-    .groupby(["Shipping provider", "Placed to Delivery TAT Status"])
-    .size()
-    .reset_index(name="Count")
-)
 
-provider_sla_fig = px.bar(
-    provider_sla,
-    x="Shipping provider",
-    y="Count",
-    color="Placed to Delivery TAT Status",
-    title="Provider-wise In-TAT vs Out-TAT",
-    text="Count"
-)
+def provider_sla_section(section):
+    st.subheader("Shipping Provider SLA Performance")
 
-provider_sla_fig.update_traces(
-    hovertemplate="Count: %{y}<extra></extra>"
-)
+    provider_sla = section.aggregate(metrics.provider_sla, filtered_df)
 
-st.plotly_chart(provider_sla_fig, use_container_width=True)
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.provider_sla_figure, provider_sla),
+        use_container_width=True
+    )
 
 
 # Courier breakup
-st.subheader("Courier Split for Selected Provider")
-
-provider = st.selectbox(
-    "Select Shipping Provider",
-    provider_perf["Shipping provider"]
-)
-
-courier_split = (
-    filtered_df[filtered_df["Shipping provider"] == provider]
-    .groupby("Shipping Courier")
-    .size()
-    .reset_index(name="Count")
-)
-
-courier_pie = px.pie(
-    courier_split,
-    names="Shipping Courier",
-    values="Count",
-    title=f"Courier Split – {provider}"
-)
-
-st.plotly_chart(courier_pie, use_container_width=True)
-
-st.subheader("Courier SLA Performance")
+def courier_split_section(section):
+    st.subheader("Courier Split for Selected Provider")
 
-# 🔽 Provider dropdown
-provider_for_courier_sla = st.selectbox(
-    "Select Shipping Provider for Courier SLA",
-    sorted(filtered_df["Shipping provider"].dropna().unique()),
-    key="courier_sla_provider"
-)
+    provider = st.selectbox(
+        "Select Shipping Provider",
+        results["Provider Load"]["Shipping provider"]
+    )
 
-# 🔍 Filter by selected provider
-courier_sla_df = filtered_df[
-    filtered_df["Shipping provider"] == provider_for_courier_sla
-]
+    providers = drilldown_by(section, "Shipping provider")
+    courier_split = section.aggregate(
+        lambda: metrics.courier_split(providers.rows(provider)),
+        key=provider
+    )
 
-# 📊 Aggregate courier SLA
-courier_sla = (
-    courier_sla_df
-    .groupby(["Shipping Courier", "Placed to Delivery TAT Status"])
-    .size()
-    .reset_index(name="Count")
-)
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.courier_pie_figure, courier_split, provider),
+        use_container_width=True
+    )
 
-# 📈 Plot
-courier_sla_fig = px.bar(
-    courier_sla,
-    x="Shipping Courier",
-    y="Count",
-    color="Placed to Delivery TAT Status",
-    title=f"Courier-wise In-TAT vs Out-TAT – {provider_for_courier_sla}",
-    text="Count"
-)
+def courier_sla_section(section):
+    st.subheader("Courier SLA Performance")
 
-courier_sla_fig.update_traces(
-    hovertemplate="Courier: %{x}<br>Count: %{y}<extra></extra>"
-)
+    providers = drilldown_by(section, "Shipping provider")
 
-st.plotly_chart(courier_sla_fig, use_container_width=True)
+    # 🔽 Provider dropdown
+    provider_for_courier_sla = st.selectbox(
+        "Select Shipping Provider for Courier SLA",
+        providers.labels,
+        key="courier_sla_provider"
+    )
 
+    # 📊 Aggregate courier SLA for the selected provider
+    courier_sla = section.aggregate(
+        lambda: metrics.courier_sla(providers.rows(provider_for_courier_sla)),
+        key=provider_for_courier_sla
+    )
 
-st.subheader("Zone SLA Distribution (Delivered Orders)")
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.courier_sla_figure, courier_sla, provider_for_courier_sla),
+        use_container_width=True
+    )
 
-zone_sla = (
-    filtered_df[filtered_df["Final Status"].str.lower() == "delivered"]
-    .groupby(["Zone", "Placed to Delivery TAT Status"])
-    .size()
-    .reset_index(name="Count")
-)
 
-zone = st.selectbox("Select Zone", zone_sla["Zone"].unique())
+def zone_sla_section(section):
+    st.subheader("Zone SLA Distribution (Delivered Orders)")
 
-zone_pie_df = zone_sla[zone_sla["Zone"] == zone]
+    zone_sla = section.aggregate(metrics.zone_sla, filtered_df)
 
-zone_pie = px.pie(
-    zone_pie_df,
-    names="Placed to Delivery TAT Status",
-    values="Count",
-    title=f"SLA Split – {zone}"
-)
+    zone = st.selectbox("Select Zone", zone_sla["Zone"].unique())
 
-zone_pie.update_traces(
-    hovertemplate="Status: %{label}<br>Count: %{value}<extra></extra>"
-)
+    # The pie is one zone's slice of the aggregate already computed
+    zone_pie_df = zone_sla[zone_sla["Zone"] == zone]
 
-st.plotly_chart(zone_pie, use_container_width=True)
+    section.render(
+        st.plotly_chart,
+        section.figure(charts.zone_pie_figure, zone_pie_df, zone),
+        use_container_width=True
+    )
 
 
 
 # ---------------- DATA PREVIEW ----------------
-st.subheader("Filtered Data Preview")
-st.dataframe(filtered_df, use_container_width=True)
+def preview_section(section):
+    st.subheader("Filtered Data Preview")
+
+    # The dashboard loads its own columns only; the rest are one click away
+    all_columns = st.checkbox("Show every report column", value=False)
+    preview_df = load_full_report()[row_mask] if all_columns else filtered_df
+
+    section.render(st.dataframe, preview_df, use_container_width=True)
+
+
+# Page order
+SECTIONS = {
+    "Delivered In-TAT Trend": trend_section,
+    "Order Density Map": density_map_section,
+    "SLA Split": sla_split_section,
+    "Final Status Distribution": status_section,
+    "Dispatch Performance": dispatch_section,
+    "Delivery Performance": delivery_section,
+    "Consumer Delivery Performance": consumer_delivery_section,
+    "In-Transit SLA": intransit_section,
+    "Provider Load": provider_load_section,
+    "Provider SLA": provider_sla_section,
+    "Courier Split": courier_split_section,
+    "Courier SLA": courier_sla_section,
+    "Zone SLA": zone_sla_section,
+    "Data Preview": preview_section,
+}
+
+
+# ---------------- BACKGROUND AGGREGATIONS ----------------
+# Heavy aggregations run concurrently on the shared filtered frame while
+# the KPIs above are already on screen; sections fill in as they finish
+filtered_df = df[row_mask]
+pincode_master = load_pincode()
+
+background = {
+    "Delivered In-TAT Trend": (metrics.trend_agg, filtered_df),
+    "Order Density Map": (metrics.pincode_density, filtered_df, pincode_master),
+    "Dispatch Performance": (metrics.dispatch_agg, filtered_df),
+    "Delivery Performance": (metrics.delivery_agg, filtered_df),
+    "Consumer Delivery Performance": (metrics.consumer_delivery_agg, filtered_df),
+    "In-Transit SLA": (metrics.intransit_agg, filtered_df),
+    "Provider Load": (metrics.provider_perf, filtered_df),
+    "Provider SLA": (metrics.provider_sla, filtered_df),
+    "Zone SLA": (metrics.zone_sla, filtered_df),
+}
+
+pending = {
+    profiler.submit(section_pool(), name, *job): name
+    for name, job in background.items()
+}
+
+# Each slot is replaced when its section renders (estimates first, if any)
+slots = {name: st.empty() for name in SECTIONS}
+results = {}
+
+if fast_preview:
+    with slots["Delivered In-TAT Trend"].container(), profiler.section("Trend Preview") as section:
+        show_trend(section, section.aggregate(sampling.estimate_trend, sample, sample_mask))
+
+for future in as_completed(pending):
+    name = pending[future]
+    with slots[name].container(), profiler.section(name) as section:
+        results[name] = SECTIONS[name](section)
+
+# Widget-driven sections depend on the background results
+for name, render_section in SECTIONS.items():
+    if name not in background:
+        with slots[name].container(), profiler.section(name) as section:
+            results[name] = render_section(section)
+
+profiler.finish()
 #python -m streamlit run app.py
 #python -m venv venv
 #.\venv\Scripts\Activate.ps1
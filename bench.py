@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import input as etl
+import metrics
+import synth
+from encoding import encode_orders
+from parallel import ShardedAggregator
+from schema import APP_COLUMNS, INT_COLUMNS, load_output_report, load_pincode_master
+
+# Scaling benchmark: ETL stages, dashboard load, filtering, chart
+# aggregations and pivots on synthetic data of several sizes.
+
+# ---------------- CONFIG ----------------
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+# read_excel is only timed up to this size, writing big workbooks takes ages
+EXCEL_BENCH_MAX_ROWS = 100_000
+
+CHART_AGGREGATIONS = {
+    "trend_agg": metrics.trend_agg,
+    "dispatch_agg": metrics.dispatch_agg,
+    "delivery_agg": metrics.delivery_agg,
+    "consumer_delivery_agg": metrics.consumer_delivery_agg,
+    "intransit_agg": metrics.intransit_agg,
+    "provider_perf": metrics.provider_perf,
+    "provider_sla": metrics.provider_sla,
+    "zone_sla": metrics.zone_sla,
+}
+
+
+def timed(fn, *args, repeat=1):
+    # Best of `repeat` runs; the last result is returned for the next step
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def typical_filters(orders):
+    # Busiest zones and facility, the way a user narrows the dashboard
+    zones = orders.count_by("Zone").nlargest(3).index.tolist()
+    facility = orders.count_by("Facility").nlargest(1).index.tolist()
+    return {"zone": zones, "facility": facility}
+
+
+# ---------------- ONE SIZE ----------------
+def bench_size(rows, work_dir, repeat=1, seed=0, workers=1):
+    results = []
+
+    def record(group, stage, seconds, rows_out=None):
+        results.append({
+            "rows": rows,
+            "group": group,
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "rows_out": rows_out,
+        })
+
+    raw = synth.consolidated_report(rows, seed=seed)
+
+    # ---------- ETL ----------
+    if rows <= EXCEL_BENCH_MAX_ROWS:
+        excel_path = os.path.join(work_dir, etl.INPUT_FILE)
+        raw.to_excel(excel_path, index=False)
+        seconds, _ = timed(etl.load, excel_path, None)
+        record("etl", "LOAD", seconds, rows)
+
+    df = raw
+    for name, stage in etl.STAGES:
+        seconds, df = timed(lambda: stage(df.copy()), repeat=repeat)
+        record("etl", name, seconds, len(df))
+
+    output_path = os.path.join(work_dir, etl.OUTPUT_FILE)
+    seconds, _ = timed(etl.write_output, df, output_path)
+    record("etl", "OUTPUT", seconds, len(df))
+
+    synth.pincodes(seed).to_csv(os.path.join(work_dir, "pincode.csv"), index=False)
+
+    # ---------- DASHBOARD LOAD ----------
+    seconds, app_df = timed(load_output_report, output_path, APP_COLUMNS, repeat=repeat)
+    record("load", "load_data (app.py)", seconds, len(app_df))
+
+    seconds, int_df = timed(load_output_report, output_path, INT_COLUMNS, repeat=repeat)
+    record("load", "load (int.py)", seconds, len(int_df))
+
+    seconds, orders = timed(encode_orders, app_df, repeat=repeat)
+    record("load", "encode_orders (app.py)", seconds, orders.n_rows)
+
+    seconds, int_orders = timed(encode_orders, int_df, list(int_df.columns), repeat=repeat)
+    record("load", "encode_orders (int.py)", seconds, int_orders.n_rows)
+
+    # ---------- FILTERING ----------
+    filters = typical_filters(orders)
+
+    seconds, row_mask = timed(metrics.filter_rows, orders, None, filters["facility"], None, filters["zone"], repeat=repeat)
+    record("filter", "filter_rows", seconds, int(row_mask.sum()))
+
+    seconds, filtered_df = timed(lambda: app_df[row_mask], repeat=repeat)
+    record("filter", "slice filtered_df", seconds, len(filtered_df))
+
+    seconds, kpis = timed(metrics.compute_kpis, orders, row_mask, repeat=repeat)
+    record("filter", "compute_kpis", seconds)
+
+    seconds, _ = timed(metrics.executive_summary, orders, row_mask, kpis, repeat=repeat)
+    record("filter", "executive_summary", seconds)
+
+    # ---------- CHART AGGREGATIONS ----------
+    for name, aggregate in CHART_AGGREGATIONS.items():
+        seconds, agg = timed(aggregate, filtered_df, repeat=repeat)
+        record("charts", name, seconds, len(agg))
+
+    pincode_master = load_pincode_master(os.path.join(work_dir, "pincode.csv"))
+    seconds, agg = timed(metrics.pincode_density, filtered_df, pincode_master, repeat=repeat)
+    record("charts", "pincode_density", seconds, len(agg))
+
+    # ---------- PIVOTS ----------
+    int_rows = int_orders.all_rows()
+    for tat_type, tat_col in metrics.TAT_MAP.items():
+        for pivot_col in ["Zone", "Shipping Courier", "Facility"]:
+            seconds, pivot = timed(metrics.tat_pivot, int_orders, int_rows, pivot_col, tat_col, repeat=repeat)
+            record("pivots", f"tat_pivot {tat_type} | {pivot_col}", seconds, len(pivot))
+
+    seconds, pivot = timed(metrics.dispatch_pivot, int_orders, int_rows, repeat=repeat)
+    record("pivots", "dispatch_pivot", seconds, len(pivot))
+
+    seconds, pivot = timed(metrics.zone_pivot, int_orders, int_rows, repeat=repeat)
+    record("pivots", "zone_pivot", seconds, len(pivot))
+
+    # ---------- SHARDED COUNTS ----------
+    if workers > 1:
+        aggregator = ShardedAggregator(int_orders, "Facility", workers, min_rows=0)
+        int_orders.aggregator = aggregator
+        try:
+            int_orders.count_by("Zone")  # spawns the workers, not timed
+            seconds, pivot = timed(metrics.zone_pivot, int_orders, int_rows, repeat=repeat)
+            record("parallel", f"zone_pivot ({workers} workers)", seconds, len(pivot))
+
+            seconds, pivot = timed(metrics.dispatch_pivot, int_orders, int_rows, repeat=repeat)
+            record("parallel", f"dispatch_pivot ({workers} workers)", seconds, len(pivot))
+        finally:
+            int_orders.aggregator = None
+            aggregator.close()
+
+    return results
+
+
+# ---------------- SUITE ----------------
+def run_suite(sizes, repeat=1, seed=0, workers=1):
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "workers": workers,
+        "results": [],
+    }
+
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as work_dir:
+            started = time.perf_counter()
+            report["results"].extend(bench_size(rows, work_dir, repeat, seed, workers))
+            print(f"{rows:>12,} rows benchmarked in {time.perf_counter() - started:.1f}s")
+
+    return report
+
+
+def summary_table(report):
+    results = pd.DataFrame(report["results"])
+    return results.pivot_table(
+        index=["group", "stage"], columns="rows", values="seconds", sort=False
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL and dashboards on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_report.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="process pool size for the sharded count benchmarks")
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.repeat, args.seed, args.workers)
+
+    with open(args.out, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    with pd.option_context("display.width", 200, "display.max_rows", 200):
+        print(summary_table(report).round(4).to_string())
+
+    print("Benchmark report written to", args.out)
+
+
+if __name__ == "__main__":
+    main()
+
+#python bench.py --sizes 10000 100000 1000000 10000000 --out bench_report.json
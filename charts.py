@@ -0,0 +1,233 @@
+import plotly.express as px
+
+# Plotly figure builders for the dashboard charts. Each takes the
+# aggregate produced by the matching function in metrics.py.
+
+MARGIN = {"r":0,"t":40,"l":0,"b":0}
+
+
+TREND_LABELS = {"Day": "daily", "Week": "weekly", "Month": "monthly"}
+
+
+def trend_figure(trend_agg):
+    # Sampled estimates (sampling.estimate_trend) carry a "CI" column
+    estimated = "CI" in trend_agg.columns
+    granularity = trend_agg.attrs.get("granularity", "Day")
+
+    fig = px.line(
+        trend_agg,
+        x="order_date",
+        y="Delivered In-TAT %",
+        error_y="CI" if estimated else None,
+        markers=len(trend_agg) <= 60,
+        title=f"Delivered In-TAT % Over Time ({TREND_LABELS[granularity]}"
+              + (", estimate, 95% CI)" if estimated else ")")
+    )
+
+    fig.update_traces(
+        name="In-TAT %",
+        showlegend=True,
+        line=dict(width=3),
+        hovertemplate=f"{granularity}: %{{x|%d %b %Y}}<br>In-TAT: %{{y}}%<extra></extra>"
+    )
+
+    if "Rolling In-TAT %" in trend_agg.columns:
+        fig.add_scatter(
+            x=trend_agg["order_date"],
+            y=trend_agg["Rolling In-TAT %"],
+            mode="lines",
+            name="Rolling In-TAT %",
+            line=dict(width=2, dash="dot"),
+            hovertemplate="Rolling: %{y}%<extra></extra>"
+        )
+
+    fig.update_layout(
+        yaxis=dict(range=[80, 100]),
+        margin=MARGIN
+    )
+
+    # Optional SLA target line (recommended)
+    fig.add_hline(
+        y=95,
+        line_dash="dash",
+        annotation_text="Target: 95%",
+        annotation_position="top left"
+    )
+
+    return fig
+
+
+def density_map_figure(map_df):
+    fig = px.scatter_mapbox(
+        map_df,
+        lat="latitude",
+        lon="longitude",
+        size="Orders",
+        color="Orders",
+        color_continuous_scale="Blues_r",
+        zoom=4,
+        hover_name="Order Pincode",
+        title="Order Density Map"
+    )
+
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        mapbox=dict(
+            center=dict(lat=22.9734, lon=78.6569),  # 🇮🇳 India center
+            zoom=4.2,
+            bounds=dict(
+                west=68.0,
+                east=97.5,
+                south=6.0,
+                north=36.5
+            )
+        ),
+        margin=MARGIN
+    )
+
+    return fig
+
+
+def sla_pie_figure(sla_split, status_choice):
+    return px.pie(
+        sla_split,
+        names="Placed to Delivery TAT Status",
+        values="Count",
+        title=f"{status_choice} SLA Split"
+    )
+
+
+def status_pie_figure(filtered_df):
+    return px.pie(
+        filtered_df,
+        names="Final Status",
+        title="Order Final Status Split"
+    )
+
+
+def share_bar_figure(agg, x, color, title):
+    fig = px.bar(
+        agg,
+        x=x,
+        y="Count",
+        color=color,
+        text=agg["Percentage"].astype(str) + "%",
+        title=title
+    )
+
+    fig.update_traces(
+        hovertemplate="Count: %{y}<extra></extra>"
+    )
+
+    return fig
+
+
+def dispatch_figure(dispatch_agg):
+    return share_bar_figure(
+        dispatch_agg, "Facility", "Dispatch TAT Status", "Dispatch TAT by Facility"
+    )
+
+
+def delivery_figure(delivery_agg):
+    return share_bar_figure(
+        delivery_agg, "Zone", "Placed to Delivery TAT Status", "Placed to Delivery TAT by Zone"
+    )
+
+
+def consumer_delivery_figure(consumer_delivery_agg):
+    return share_bar_figure(
+        consumer_delivery_agg,
+        "Zone",
+        "Consumer to Delivery TAT Status",
+        "Consumer Facing Placed to Delivery TAT (Delivered Orders)"
+    )
+
+
+def intransit_figure(intransit_agg):
+    fig = px.bar(
+        intransit_agg,
+        x="Pickup to Delivery TAT Status",
+        y="Count",
+        text=intransit_agg["Percentage"].astype(str) + "%",
+        title="In-Transit Orders SLA Status (Pickup to Delivery)"
+    )
+
+    fig.update_traces(
+        hovertemplate="Count: %{y}<extra></extra>"
+    )
+
+    return fig
+
+
+def provider_pie_figure(provider_perf):
+    fig = px.pie(
+        provider_perf,
+        names="Shipping provider",
+        values="Count",
+        title="Orders by Shipping Provider",
+        hole=0.4
+    )
+
+    fig.update_traces(
+        hovertemplate="Provider: %{label}<br>Orders: %{value}<extra></extra>"
+    )
+
+    return fig
+
+
+def provider_sla_figure(provider_sla):
+    fig = px.bar(
+        provider_sla,
+        x="Shipping provider",
+        y="Count",
+        color="Placed to Delivery TAT Status",
+        title="Provider-wise In-TAT vs Out-TAT",
+        text="Count"
+    )
+
+    fig.update_traces(
+        hovertemplate="Count: %{y}<extra></extra>"
+    )
+
+    return fig
+
+
+def courier_pie_figure(courier_split, provider):
+    return px.pie(
+        courier_split,
+        names="Shipping Courier",
+        values="Count",
+        title=f"Courier Split – {provider}"
+    )
+
+
+def courier_sla_figure(courier_sla, provider):
+    fig = px.bar(
+        courier_sla,
+        x="Shipping Courier",
+        y="Count",
+        color="Placed to Delivery TAT Status",
+        title=f"Courier-wise In-TAT vs Out-TAT – {provider}",
+        text="Count"
+    )
+
+    fig.update_traces(
+        hovertemplate="Courier: %{x}<br>Count: %{y}<extra></extra>"
+    )
+
+    return fig
+
+
+def zone_pie_figure(zone_pie_df, zone):
+    fig = px.pie(
+        zone_pie_df,
+        names="Placed to Delivery TAT Status",
+        values="Count",
+        title=f"SLA Split – {zone}"
+    )
+
+    fig.update_traces(
+        hovertemplate="Status: %{label}<br>Count: %{value}<extra></extra>"
+    )
+
+    return fig
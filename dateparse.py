@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+# Date parsing shared by input.py and the typed Output_Report loader. Each
+# column's format is detected once from a sample, every distinct value is
+# parsed once (order dates repeat heavily) and values that still fail to
+# parse are counted per column.
+
+# ---------------- CONFIG ----------------
+# Day-first formats come first: they win ties on ambiguous samples
+DATE_FORMATS = [
+    "%d-%m-%Y",
+    "%d/%m/%Y",
+    "%d-%m-%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d-%b-%y",
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%m-%d-%Y",
+]
+
+SAMPLE_SIZE = 500
+
+# pandas' own resolution for parsed strings
+RESOLUTION = "datetime64[us]"
+
+
+def candidate_formats(dayfirst=True):
+    if dayfirst:
+        return DATE_FORMATS
+    # pandas' own default: month-first wins ambiguous samples
+    return sorted(DATE_FORMATS, key=lambda fmt: not fmt.startswith("%m"))
+
+
+def detect_format(strings, dayfirst=True, sample_size=SAMPLE_SIZE):
+    # Most parsed values in an evenly spaced sample wins; None if nothing parses
+    if len(strings) == 0:
+        return None
+
+    step = max(1, len(strings) // sample_size)
+    sample = pd.Series(strings[::step][:sample_size])
+
+    best, best_parsed = None, 0
+    for fmt in candidate_formats(dayfirst):
+        parsed = int(pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum())
+        if parsed > best_parsed:
+            best, best_parsed = fmt, parsed
+        if parsed == len(sample):
+            break
+
+    return best
+
+
+def parse_unique(uniques, fmt=None, dayfirst=True):
+    # uniques: object array of distinct values (strings and/or datetimes)
+    parsed = pd.Series(pd.NaT, index=range(len(uniques)), dtype=RESOLUTION)
+    report = {"format": fmt, "fallback": 0}
+
+    is_text = np.array([isinstance(value, str) for value in uniques], dtype=bool)
+
+    if (~is_text).any():
+        parsed[~is_text] = pd.to_datetime(pd.Series(uniques[~is_text]), errors="coerce").to_numpy()
+
+    text = pd.Series(uniques[is_text]).str.strip()
+    filled = text.ne("").to_numpy()
+    positions = np.flatnonzero(is_text)[filled]
+    text = text[filled]
+
+    if len(text):
+        fmt = fmt or detect_format(text.to_numpy(), dayfirst)
+        report["format"] = fmt
+
+        values = pd.Series(pd.NaT, index=text.index, dtype=RESOLUTION)
+        if fmt is not None:
+            values = pd.to_datetime(text, format=fmt, errors="coerce")
+
+        # Whatever the detected format misses tries the other candidates,
+        # then inference
+        detected = values.notna()
+        missed = ~detected
+        for other in candidate_formats(dayfirst):
+            if not missed.any():
+                break
+            values[missed] = pd.to_datetime(text[missed], format=other, errors="coerce")
+            missed = values.isna()
+
+        if missed.any():
+            values[missed] = pd.to_datetime(
+                text[missed], format="mixed", dayfirst=dayfirst, errors="coerce"
+            )
+
+        report["fallback"] = int((values.notna() & ~detected).sum())
+
+        parsed[positions] = values.to_numpy()
+
+    failed = np.zeros(len(uniques), dtype=bool)
+    failed[~is_text] = ~pd.isna(uniques[~is_text])
+    failed[positions] = True
+    failed &= parsed.isna().to_numpy()
+
+    return parsed.to_numpy(), failed, report
+
+
+def parse_dates(values, fmt=None, dayfirst=True):
+    # Returns (datetime64 Series, report); already-typed columns pass through
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, {"format": "native", "rows": len(values), "unique": None, "fallback": 0, "failed": 0}
+
+    codes, uniques = pd.factorize(values)
+    uniques = np.asarray(uniques, dtype=object)
+
+    parsed, failed, report = parse_unique(uniques, fmt, dayfirst)
+
+    # Code -1 (missing) gathers the trailing NaT
+    result = np.append(parsed, np.datetime64("NaT"))[codes]
+    failed_rows = int(np.bincount(codes[codes >= 0], minlength=len(uniques))[failed].sum())
+
+    report.update({"rows": len(values), "unique": len(uniques), "failed": failed_rows})
+    return pd.Series(result, index=values.index, name=values.name), report
+
+
+def parse_date_columns(df, columns, fmt=None, dayfirst=True):
+    report = {}
+    for col in columns:
+        if col in df.columns:
+            df[col], report[col] = parse_dates(df[col], fmt, dayfirst)
+    return report
+
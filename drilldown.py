@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+# Drill-down partitions for app.py: the filtered frame is split once per
+# column, so picking one value gathers that group's rows instead of
+# rescanning the whole frame with `frame[frame[col] == value]`.
+
+
+class Partition:
+
+    def __init__(self, frame, col):
+        codes, uniques = pd.factorize(frame[col], sort=True)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+        # Stable sort keeps the original row order inside every group;
+        # null rows (code -1) sort first and are dropped
+        order = np.argsort(codes, kind="stable")
+
+        self.frame = frame
+        self.col = col
+        self.labels = list(uniques)
+        self.positions = order[len(order) - int(counts.sum()):]
+        self.bounds = np.concatenate([[0], np.cumsum(counts)])
+        self.lookup = {label: i for i, label in enumerate(self.labels)}
+
+    def size(self, label):
+        i = self.lookup.get(label)
+        return 0 if i is None else int(self.bounds[i + 1] - self.bounds[i])
+
+    def rows(self, label):
+        # Same rows, same order as frame[frame[col] == label]
+        i = self.lookup.get(label)
+        if i is None:
+            return self.frame.iloc[:0]
+        return self.frame.iloc[self.positions[self.bounds[i]:self.bounds[i + 1]]]
+
+
+def partition(frame, col):
+    return Partition(frame, col)
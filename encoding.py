@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# ---------------- ENCODED COLUMNS ----------------
+# Status and dimension columns stored as small-int codes into one
+# dictionary per column. The last code of every column is the null slot.
+ENCODED_DIMENSIONS = [
+    "Final Status",
+    "Dispatch TAT Status",
+    "Placed to Delivery TAT Status",
+    "Consumer to Delivery TAT Status",
+    "Pickup to Delivery TAT Status",
+    "E2E TAT Status",
+    "Zone",
+    "Facility",
+    "Shipping provider",
+    "Shipping Courier",
+    "Series",
+    "Payment method",
+    "Reshipped",
+]
+
+ENCODED_DATES = [
+    "UC Order Date (Date)",
+]
+
+RESHIPPED_VALUES = ["yes", "y", "true", "1", "reshipped"]
+
+# Dates are int32 days since 1970-01-01, missing dates get NO_DAY
+NO_DAY = np.iinfo(np.int32).min
+
+
+def code_dtype(size):
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def day_number(value):
+    return int(pd.Timestamp(value).to_datetime64().astype("datetime64[D]").astype(np.int64))
+
+
+def day_numbers(series):
+    days = series.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    numbers = days.astype(np.int64)
+    numbers[np.isnat(days)] = NO_DAY
+    return numbers.astype(np.int32)
+
+
+# ---------------- ENCODED ORDERS ----------------
+class EncodedOrders:
+
+    def __init__(self, n_rows):
+        self.n_rows = n_rows
+        self.codes = {}
+        self.labels = {}
+        self.days = {}
+        self.bits = {}
+        # Optional parallel.ShardedAggregator that count_by hands big counts to
+        self.aggregator = None
+
+    # ---------- building ----------
+    def add_dimension(self, col, series):
+        codes, uniques = pd.factorize(series, sort=True)
+        labels = pd.Index(np.asarray(uniques), name=col)
+
+        codes = codes.astype(code_dtype(len(labels)))
+        codes[codes < 0] = len(labels)
+
+        self.codes[col] = codes
+        self.labels[col] = labels
+
+    def add_date(self, col, series):
+        self.days[col] = day_numbers(series)
+
+    def add_flag(self, name, values):
+        self.bits[name] = np.packbits(np.asarray(values, dtype=bool))
+
+    # ---------- row masks ----------
+    def label_mask(self, col, predicate):
+        # Evaluate the predicate once per dictionary entry, then gather by code
+        table = np.asarray(predicate(pd.Series(self.labels[col])), dtype=bool)
+        return np.append(table, False)[self.codes[col]]
+
+    def isin(self, col, values):
+        return self.label_mask(col, lambda labels: labels.isin(values))
+
+    def date_between(self, col, start, end):
+        days = self.days[col]
+        return (days >= day_number(start)) & (days <= day_number(end))
+
+    def flag(self, name):
+        return np.unpackbits(self.bits[name], count=self.n_rows).astype(bool)
+
+    def all_rows(self):
+        return np.ones(self.n_rows, dtype=bool)
+
+    # ---------- aggregations ----------
+    def count_by(self, cols, mask=None):
+        # Observed groups only, null keys dropped (same as groupby(observed=True))
+        cols = [cols] if isinstance(cols, str) else list(cols)
+        sizes = [len(self.labels[col]) + 1 for col in cols]
+
+        if self.aggregator is not None and self.n_rows >= self.aggregator.min_rows:
+            counts = self.aggregator.bincount(cols, sizes, mask)
+        else:
+            combined = np.zeros(self.n_rows, dtype=np.int64)
+            for col, size in zip(cols, sizes):
+                combined = combined * size + self.codes[col]
+
+            if mask is not None:
+                combined = combined[mask]
+
+            counts = np.bincount(combined, minlength=int(np.prod(sizes)))
+        keys = np.unravel_index(np.flatnonzero(counts), sizes)
+
+        observed = np.ones(len(keys[0]), dtype=bool)
+        for key, size in zip(keys, sizes):
+            observed &= key < size - 1
+
+        values = counts[np.flatnonzero(counts)][observed]
+
+        if len(cols) == 1:
+            index = self.labels[cols[0]][keys[0][observed]]
+        else:
+            index = pd.MultiIndex.from_arrays(
+                [self.labels[col][key[observed]] for col, key in zip(cols, keys)],
+                names=cols
+            )
+
+        return pd.Series(values, index=index, dtype=np.int64)
+
+    def take(self, rows):
+        # Row subset (positions) sharing the same dictionaries
+        subset = EncodedOrders(len(rows))
+        subset.labels = self.labels
+        subset.codes = {col: codes[rows] for col, codes in self.codes.items()}
+        subset.days = {col: days[rows] for col, days in self.days.items()}
+        subset.bits = {name: np.packbits(self.flag(name)[rows]) for name in self.bits}
+        return subset
+
+    def nbytes(self):
+        arrays = [*self.codes.values(), *self.days.values(), *self.bits.values()]
+        return sum(array.nbytes for array in arrays)
+
+
+def encode_orders(df, dimensions=ENCODED_DIMENSIONS, dates=ENCODED_DATES):
+    orders = EncodedOrders(len(df))
+
+    for col in dimensions:
+        if col in df.columns:
+            orders.add_dimension(col, df[col])
+
+    for col in dates:
+        if col in df.columns:
+            orders.add_date(col, df[col])
+
+    if "Reshipped" in orders.codes:
+        orders.add_flag(
+            "Reshipped_Flag",
+            orders.label_mask(
+                "Reshipped",
+                lambda labels: labels.astype(str).str.strip().str.lower().isin(RESHIPPED_VALUES)
+            )
+        )
+
+    if "UNICOM Order ID" in df.columns:
+        orders.add_flag("Has UNICOM Order ID", df["UNICOM Order ID"].notna())
+
+    if "Final Shipment" in df.columns:
+        orders.add_flag("Final_Shipment_Flag", df["Final Shipment"] == "Yes")
+
+    return orders
@@ -0,0 +1,115 @@
+import io
+import os
+import tempfile
+
+import numpy as np
+import openpyxl
+
+from schema import OUTPUT_DATE_FORMAT
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Streaming table export for int.py. Tables are written chunk by chunk to
+# a temporary file on disk (CSV text, a write-only openpyxl workbook, or
+# Parquet row groups), so the writer holds one chunk at a time whatever
+# the row count.
+
+# ---------------- CONFIG ----------------
+EXPORT_CHUNK_ROWS = 50_000
+
+# Data rows per worksheet; the header takes the last Excel row
+XLSX_MAX_ROWS = 1_048_575
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+if pa is not None:
+    EXPORT_FORMATS["Parquet"] = ("parquet", "application/vnd.apache.parquet")
+
+
+# ---------------- CHUNKS ----------------
+def chunks(df, rows=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # rows: optional boolean mask; always yields at least the (empty) header
+    positions = np.arange(len(df)) if rows is None else np.flatnonzero(rows)
+
+    yield df.iloc[positions[:chunk_rows]]
+    for start in range(chunk_rows, len(positions), chunk_rows):
+        yield df.iloc[positions[start:start + chunk_rows]]
+
+
+# ---------------- WRITERS ----------------
+def write_csv(parts, handle):
+    for number, part in enumerate(parts):
+        text = part.to_csv(index=False, header=number == 0, date_format=OUTPUT_DATE_FORMAT)
+        handle.write(text.encode("utf-8"))
+
+
+def xlsx_values(part):
+    # openpyxl wants None for missing values
+    values = part.astype(object)
+    return values.where(part.notna(), None).itertuples(index=False, name=None)
+
+
+def write_xlsx(parts, handle, sheet="Export"):
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet, written, sheets = None, XLSX_MAX_ROWS, 0
+
+    for part in parts:
+        header = [str(col) for col in part.columns]
+        for row in xlsx_values(part):
+            # Roll over to a new sheet when Excel's row limit is reached
+            if written == XLSX_MAX_ROWS:
+                sheets += 1
+                worksheet = workbook.create_sheet(sheet if sheets == 1 else f"{sheet} ({sheets})")
+                worksheet.append(header)
+                written = 0
+            worksheet.append(row)
+            written += 1
+
+    if worksheet is None:
+        workbook.create_sheet(sheet).append(header)
+
+    workbook.save(handle)
+
+
+def write_parquet(parts, handle):
+    writer = None
+    for part in parts:
+        table = pa.Table.from_pandas(
+            part, schema=writer.schema if writer else None, preserve_index=False
+        )
+        if writer is None:
+            writer = pq.ParquetWriter(handle, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+WRITERS = {"CSV": write_csv, "XLSX": write_xlsx, "Parquet": write_parquet}
+
+
+class ExportFile(io.BufferedReader):
+    # Read handle on a finished export; the file is removed once the handle
+    # is closed, or collected after Streamlit has read it
+
+    def close(self):
+        if self.closed:
+            return
+        super().close()
+        os.remove(self.name)
+
+
+def export_table(df, fmt, rows=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # st.download_button only reads buffered readers, not read/write handles
+    handle = tempfile.NamedTemporaryFile(suffix=f".{EXPORT_FORMATS[fmt][0]}", delete=False)
+    try:
+        with handle:
+            WRITERS[fmt](chunks(df, rows, chunk_rows), handle)
+    except BaseException:
+        os.remove(handle.name)
+        raise
+    return ExportFile(io.FileIO(handle.name, "rb"))
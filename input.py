@@ -1,28 +1,25 @@
+import hashlib
+import json
+import os
+
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+import alerts
+import dateparse
+from profiling import StageProfiler
+
 # ---------------- CONFIG ----------------
 INPUT_FILE = "Consolidated_Report.xlsx"
 OUTPUT_FILE = "Output_Report.csv"
+TRACE_FILE = "etl_trace.json"
 
-TODAY = pd.to_datetime(datetime.today().date())
-
-# ---------------- LOAD ----------------
-df = pd.read_excel(INPUT_FILE)
-
-# ---------------- FILTER PICKED UP ORDERS ----------------
-df = df[df["Order Dispatched"].astype(str).str.lower() == "yes"].copy()
-# ---------------- REMOVE BLANK FINAL STATUS ----------------
-df = df[
-    df["Final Status"]
-    .notna() &
-    df["Final Status"]
-    .astype(str)
-    .str.strip()
-    .ne("")
-].copy()
+# Parsed, column-projected workbooks keyed by content hash
+PARSE_CACHE_DIR = ".parse_cache"
+PARSE_CACHE_KEEP = 3
 
+TODAY = pd.to_datetime(datetime.today().date())
 
 # ---------------- KEEP ONLY REQUIRED COLUMNS ----------------
 required_columns = [
@@ -45,7 +42,7 @@ required_columns = [
     "Shipping provider",
     "Shipping Courier",
     "Tracking No.",
-    "Assigned Date_D",        
+    "Assigned Date_D",
     "CP Order Status",
     "Pickup Date (Date)",
     "Delivery Date (Date)",
@@ -54,8 +51,6 @@ required_columns = [
     "Reshipped"
 ]
 
-df = df[required_columns]
-
 # ---------------- DATE PARSING ----------------
 date_cols = [
     "Devx Order Date (Date)",
@@ -65,150 +60,364 @@ date_cols = [
     "Delivery Date (Date)"
 ]
 
-for col in date_cols:
-    df[col] = pd.to_datetime(df[col], errors="coerce")
+# ---------------- FORMAT DATE COLUMNS (DD-MM-YYYY) ----------------
+date_format_cols = [
+    "Devx Order Date (Date)",
+    "UC Order Date (Date)",
+    "Ideal Dispatch Date",
+    "Ideal Dispatch Date(R)",
+    "Dispatch Date (Date)",
+    "Assigned Date_D",
+    "Pickup Date (Date)",
+    "Delivery Date (Date)"
+]
+
+zone_map = {
+    "a": 2,
+    "b": 3,
+    "c": 3,
+    "d": 5,
+    "e": 7,
+    "sdd": 0,
+    "ndd": 1
+}
+
+
+# ---------------- LOAD ----------------
+def load_columns():
+    # Raw columns the stages read: the dispatch flag plus required_columns
+    return ["Order Dispatched", *required_columns]
+
+
+def parse_cache_key(input_file, columns):
+    # Workbook bytes, projected columns and pandas version (pickle format)
+    digest = hashlib.sha256()
+    with open(input_file, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps([columns, pd.__version__]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def prune_parse_cache(cache_dir, keep=PARSE_CACHE_KEEP):
+    entries = sorted(
+        (os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".pkl")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for path in entries[keep:]:
+        os.remove(path)
+
+
+def load(input_file=INPUT_FILE, cache_dir=PARSE_CACHE_DIR):
+    columns = load_columns()
+    if cache_dir is None:
+        return pd.read_excel(input_file, usecols=columns)
+
+    cache_file = os.path.join(cache_dir, parse_cache_key(input_file, columns) + ".pkl")
+    if os.path.exists(cache_file):
+        return pd.read_pickle(cache_file)
+
+    df = pd.read_excel(input_file, usecols=columns)
+
+    # Written aside and renamed, so an interrupted run leaves no partial entry
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_pickle(cache_file + ".tmp")
+    os.replace(cache_file + ".tmp", cache_file)
+    prune_parse_cache(cache_dir)
+
+    return df
+
+
+# ---------------- FILTER PICKED UP ORDERS ----------------
+def filter_orders(df):
+    df = df[df["Order Dispatched"].astype(str).str.lower() == "yes"].copy()
+    # ---------------- REMOVE BLANK FINAL STATUS ----------------
+    df = df[
+        df["Final Status"]
+        .notna() &
+        df["Final Status"]
+        .astype(str)
+        .str.strip()
+        .ne("")
+    ].copy()
+
+    return df[required_columns]
+
+
+def parse_dates(df):
+    # Month-first on ambiguous text, same as pandas' own inference
+    df.attrs["date_parse"] = dateparse.parse_date_columns(df, date_cols, dayfirst=False)
+
+    # ---------------- WEEK CALCULATION (UC ORDER DATE) ----------------
+    df["Week"] = np.where(
+        df["UC Order Date (Date)"].notna(),
+        ((df["UC Order Date (Date)"].dt.day - 1) // 7) + 1,
+        np.nan
+    )
+
+    return df
 
-# ---------------- WEEK CALCULATION (UC ORDER DATE) ----------------
-df["Week"] = np.where(
-    df["UC Order Date (Date)"].notna(),
-    ((df["UC Order Date (Date)"].dt.day - 1) // 7) + 1,
-    np.nan
-)
 
 # ---------------- PICKUP DATE FALLBACK (FACILITY BASED) ----------------
+def pickup_fallback(df, today=TODAY):
+    # Normalize Facility for comparison
+    df["Facility_Normalized"] = (
+        df["Facility"]
+        .astype(str)
+        .str.lower()
+        .str.replace(r"\s+", " ", regex=True)  # removes newlines & extra spaces
+        .str.strip()
+    )
 
-# Normalize Facility for comparison
-df["Facility_Normalized"] = (
-    df["Facility"]
-    .astype(str)
-    .str.lower()
-    .str.replace(r"\s+", " ", regex=True)  # removes newlines & extra spaces
-    .str.strip()
-)
 
+    df["Effective Pickup Date"] = df["Pickup Date (Date)"]
 
-df["Effective Pickup Date"] = df["Pickup Date (Date)"]
+    # If Pickup Date is blank & Facility = warehouse → Assigned Date_D
+    df.loc[
+        (df["Effective Pickup Date"].isna()) &
+        (df["Facility_Normalized"] == "warehouse"),
+        "Effective Pickup Date"
+    ] = df["Assigned Date_D"]
 
-# If Pickup Date is blank & Facility = warehouse → Assigned Date_D
-df.loc[
-    (df["Effective Pickup Date"].isna()) &
-    (df["Facility_Normalized"] == "warehouse"),
-    "Effective Pickup Date"
-] = df["Assigned Date_D"]
+    # If Pickup Date is blank & Facility = dark store → Ideal Dispatch Date
+    df.loc[
+        (df["Effective Pickup Date"].isna()) &
+        (df["Facility_Normalized"] == "dark store"),
+        "Effective Pickup Date"
+    ] = df["Ideal Dispatch Date"]
 
-# If Pickup Date is blank & Facility = dark store → Ideal Dispatch Date
-df.loc[
-    (df["Effective Pickup Date"].isna()) &
-    (df["Facility_Normalized"] == "dark store"),
-    "Effective Pickup Date"
-] = df["Ideal Dispatch Date"]
+    # ---------------- FINAL PICKUP DATE SAFETY FALLBACK ----------------
+    df.loc[
+        df["Effective Pickup Date"].isna(),
+        "Effective Pickup Date"
+    ] = df["Ideal Dispatch Date"]
 
-# ---------------- FINAL PICKUP DATE SAFETY FALLBACK ----------------
-df.loc[
-    df["Effective Pickup Date"].isna(),
-    "Effective Pickup Date"
-] = df["Ideal Dispatch Date"]
 
 
+    # ---------------- DELIVERY DATE FALLBACK ----------------
+    df["Effective Delivery Date"] = df["Delivery Date (Date)"]
+    df.loc[df["Effective Delivery Date"].isna(), "Effective Delivery Date"] = today
 
-# ---------------- DELIVERY DATE FALLBACK ----------------
-df["Effective Delivery Date"] = df["Delivery Date (Date)"]
-df.loc[df["Effective Delivery Date"].isna(), "Effective Delivery Date"] = TODAY
+    return df
 
-# ---------------- ZONE NORMALIZATION ----------------
-df["Zone"] = df["Zone"].astype(str).str.strip().str.lower()
 
-zone_map = {
-    "a": 2,
-    "b": 3,
-    "c": 3,
-    "d": 5,
-    "e": 7,
-    "sdd": 0,
-    "ndd": 1
-}
+def zone_tat(df):
+    # ---------------- ZONE NORMALIZATION ----------------
+    df["Zone"] = df["Zone"].astype(str).str.strip().str.lower()
 
-df["Calculated Ideal Delivery TAT"] = df["Zone"].map(zone_map)
+    df["Calculated Ideal Delivery TAT"] = df["Zone"].map(zone_map)
 
-# ---------------- IDEAL PLACED TO DELIVERY ----------------
-df["Ideal Placed to Delivery TAT"] = df["Calculated Ideal Delivery TAT"]
-df.loc[df["Zone"] != "sdd", "Ideal Placed to Delivery TAT"] += 1
+    # ---------------- IDEAL PLACED TO DELIVERY ----------------
+    df["Ideal Placed to Delivery TAT"] = df["Calculated Ideal Delivery TAT"]
+    df.loc[df["Zone"] != "sdd", "Ideal Placed to Delivery TAT"] += 1
 
-# ---------------- CONSUMER PLACED TO DELIVERY ----------------
-df["Consumer Placed to Delivery TAT"] = df["Ideal Placed to Delivery TAT"]
-df.loc[df["Zone"].isin(["sdd", "ndd"]), "Consumer Placed to Delivery TAT"] += 1
+    # ---------------- CONSUMER PLACED TO DELIVERY ----------------
+    df["Consumer Placed to Delivery TAT"] = df["Ideal Placed to Delivery TAT"]
+    df.loc[df["Zone"].isin(["sdd", "ndd"]), "Consumer Placed to Delivery TAT"] += 1
 
-# ---------------- DISPATCH TAT ----------------
-df["Dispatch TAT"] = (
-    df["Effective Pickup Date"] - df["Ideal Dispatch Date"]
-).dt.days.clip(lower=0)
+    return df
 
 
-df["Dispatch TAT Status"] = np.where(
-    df["Dispatch TAT"] > 1,
-    "OutTAT",
-    "InTAT"
-)
+def dispatch_tat(df):
+    # ---------------- DISPATCH TAT ----------------
+    df["Dispatch TAT"] = (
+        df["Effective Pickup Date"] - df["Ideal Dispatch Date"]
+    ).dt.days.clip(lower=0)
 
-# ---------------- PLACED TO DELIVERY ----------------
-df["Placed to Delivery TAT"] = (
-    df["Effective Delivery Date"] - df["Ideal Dispatch Date"]
-).dt.days.clip(lower=0)
 
+    df["Dispatch TAT Status"] = np.where(
+        df["Dispatch TAT"] > 1,
+        "OutTAT",
+        "InTAT"
+    )
 
-df["Placed to Delivery TAT Status"] = np.where(
-    df["Placed to Delivery TAT"] > df["Ideal Placed to Delivery TAT"],
-    "OutTAT",
-    "InTAT"
-)
+    return df
 
-# ---------------- CONSUMER TO DELIVERY STATUS ----------------
-df["Consumer to Delivery TAT Status"] = np.where(
-    df["Placed to Delivery TAT"] > df["Consumer Placed to Delivery TAT"],
-    "OutTAT",
-    "InTAT"
-)
 
-# ---------------- PICKUP TO DELIVERY ----------------
-df["Pickup to Delivery TAT"] = (
-    df["Effective Delivery Date"] - df["Effective Pickup Date"]
-).dt.days.clip(lower=0)
+def delivery_tat(df):
+    # ---------------- PLACED TO DELIVERY ----------------
+    df["Placed to Delivery TAT"] = (
+        df["Effective Delivery Date"] - df["Ideal Dispatch Date"]
+    ).dt.days.clip(lower=0)
 
 
-df["Pickup to Delivery TAT Status"] = np.where(
-    df["Pickup to Delivery TAT"] > df["Calculated Ideal Delivery TAT"],
-    "OutTAT",
-    "InTAT"
-)
+    df["Placed to Delivery TAT Status"] = np.where(
+        df["Placed to Delivery TAT"] > df["Ideal Placed to Delivery TAT"],
+        "OutTAT",
+        "InTAT"
+    )
 
-# ---------------- WRITE BACK RESOLVED PICKUP DATE ----------------
-df["Pickup Date (Date)"] = df["Effective Pickup Date"]
+    # ---------------- CONSUMER TO DELIVERY STATUS ----------------
+    df["Consumer to Delivery TAT Status"] = np.where(
+        df["Placed to Delivery TAT"] > df["Consumer Placed to Delivery TAT"],
+        "OutTAT",
+        "InTAT"
+    )
 
+    return df
 
-# ---------------- CLEANUP ----------------
-df.drop(
-    columns=["Effective Pickup Date", "Effective Delivery Date", "Facility_Normalized"],
-    inplace=True)
 
-# ---------------- FORMAT DATE COLUMNS (DD-MM-YYYY) ----------------
-date_format_cols = [
-    "Devx Order Date (Date)",
-    "UC Order Date (Date)",
-    "Ideal Dispatch Date",
-    "Ideal Dispatch Date(R)",
-    "Dispatch Date (Date)",
-    "Assigned Date_D",
-    "Pickup Date (Date)",
-    "Delivery Date (Date)"
-]
+def pickup_to_delivery_tat(df):
+    # ---------------- PICKUP TO DELIVERY ----------------
+    df["Pickup to Delivery TAT"] = (
+        df["Effective Delivery Date"] - df["Effective Pickup Date"]
+    ).dt.days.clip(lower=0)
+
+
+    df["Pickup to Delivery TAT Status"] = np.where(
+        df["Pickup to Delivery TAT"] > df["Calculated Ideal Delivery TAT"],
+        "OutTAT",
+        "InTAT"
+    )
+
+    # ---------------- WRITE BACK RESOLVED PICKUP DATE ----------------
+    df["Pickup Date (Date)"] = df["Effective Pickup Date"]
+
+
+    # ---------------- CLEANUP ----------------
+    df.drop(
+        columns=["Effective Pickup Date", "Effective Delivery Date", "Facility_Normalized"],
+        inplace=True)
+
+    return df
+
+
+def link_reshipments(df, today=TODAY):
+    # ---------------- ORDER INDEX (DEVX ORDER ID) ----------------
+    # One hash pass; every shipment of a customer order shares its code.
+    # Rows without an ID are orders of their own.
+    codes, uniques = pd.factorize(df["Devx Order ID"])
+    missing = codes < 0
+    codes[missing] = len(uniques) + np.arange(missing.sum())
+    legs = pd.Series(codes, index=df.index)
+
+    df["Shipments"] = legs.map(legs.value_counts())
 
-for col in date_format_cols:
-    if col in df.columns:
-        df[col] = df[col].dt.strftime("%d-%m-%Y")
+    # ---------------- FIRST / LATEST SHIPMENT ----------------
+    # Shipments in UC Order Date order, row order on ties
+    uc_dates = df["UC Order Date (Date)"].to_numpy(dtype="datetime64[D]")
+    uc_days = np.where(np.isnat(uc_dates), -1, uc_dates.astype(np.int64))
+    leg_order = pd.Series(uc_days * len(df) + np.arange(len(df)), index=df.index)
+    is_first = leg_order == leg_order.groupby(codes, sort=False).transform("min")
+    is_latest = leg_order == leg_order.groupby(codes, sort=False).transform("max")
+
+    # Order-level counts take one row per order: its latest shipment
+    df["Final Shipment"] = np.where(is_latest, "Yes", "No")
+
+    # Measured from the first shipment's Ideal Dispatch Date, the start of
+    # Placed to Delivery TAT, so a single shipment matches its consumer status
+    first_dispatch = (
+        df["Ideal Dispatch Date"].where(is_first).groupby(codes, sort=False).transform("max")
+    )
+
+    # Final delivery is the latest leg's; still open → today
+    final_delivery = (
+        df["Delivery Date (Date)"].where(is_latest).groupby(codes, sort=False).transform("max")
+    )
+    final_delivery = final_delivery.fillna(today)
+
+    # ---------------- END-TO-END TAT ----------------
+    df["E2E Order to Delivery TAT"] = (final_delivery - first_dispatch).dt.days.clip(lower=0)
+
+    # Against the first shipment's consumer promise
+    promise = df["Consumer Placed to Delivery TAT"].where(is_first).groupby(
+        codes, sort=False
+    ).transform("max")
+
+    df["E2E TAT Status"] = np.where(
+        df["E2E Order to Delivery TAT"] > promise,
+        "OutTAT",
+        "InTAT"
+    )
+
+    return df
+
+
+def format_dates(df):
+    for col in date_format_cols:
+        if col in df.columns:
+            df[col] = df[col].dt.strftime("%d-%m-%Y")
+
+    return df
 
 
 
 # ---------------- OUTPUT ----------------
-df.to_csv(OUTPUT_FILE, index=False)
+def write_output(df, output_file=OUTPUT_FILE):
+    df.to_csv(output_file, index=False)
+    return df
+
+
+# Transform stages in run order, shared with bench.py
+STAGES = [
+    ("FILTER", filter_orders),
+    ("DATE PARSING", parse_dates),
+    ("PICKUP FALLBACK", pickup_fallback),
+    ("ZONE TAT", zone_tat),
+    ("DISPATCH TAT", dispatch_tat),
+    ("PLACED TO DELIVERY TAT", delivery_tat),
+    ("PICKUP TO DELIVERY TAT", pickup_to_delivery_tat),
+    ("RESHIPMENT LINKING", link_reshipments),
+    ("FORMAT", format_dates),
+]
+
+
+def transform(df):
+    for _, stage in STAGES:
+        df = stage(df)
+    return df
+
+
+def main(input_file=INPUT_FILE, output_file=OUTPUT_FILE, trace_file=TRACE_FILE, trace_memory=False,
+         check_alerts=True, alert_webhook=None, parse_cache_dir=PARSE_CACHE_DIR):
+    profiler = StageProfiler(trace_memory)
+
+    df = profiler.run("LOAD", load, input_file, parse_cache_dir)
+    for name, stage in STAGES:
+        df = profiler.run(name, stage, df)
+    profiler.run("OUTPUT", write_output, df, output_file)
+
+    # ---------------- SLA BREACH ALERTS (changed rows only) ----------------
+    if check_alerts:
+        run = profiler.run("ALERTS", alerts.process_run, df, webhook=alert_webhook)
+
+    profiler.stop()
+
+    print("Final report generated successfully:", output_file)
+
+    date_report = df.attrs.get("date_parse", {})
+    for col, report in date_report.items():
+        if report["failed"]:
+            print(f"Dates: {report['failed']} value(s) in {col} could not be parsed")
+
+    if check_alerts:
+        print(f"Alerts: {run['changed']} new/changed and {run['removed']} removed orders, "
+              f"{len(run['events'])} event(s) written to {alerts.EVENTS_FILE}")
+
+    # ---------------- STAGE SUMMARY ----------------
+    print(profiler.summary())
+    profiler.write_trace(trace_file, input=input_file, output=output_file, date_parse=date_report)
+    print("Stage trace written to", trace_file)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build Output_Report.csv from Consolidated_Report.xlsx")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--trace", default=TRACE_FILE, help="JSON stage trace to write")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also record tracemalloc peak memory per stage (several times slower)")
+    parser.add_argument("--no-alerts", action="store_true", help="skip the SLA breach check")
+    parser.add_argument("--alert-webhook", default=None, help="also POST breach events to this URL")
+    parser.add_argument("--no-parse-cache", action="store_true",
+                        help="always re-parse the workbook (skip the content-hash cache)")
+    args = parser.parse_args()
+
+    main(args.input, args.output, args.trace, args.trace_memory,
+         not args.no_alerts, args.alert_webhook, None if args.no_parse_cache else PARSE_CACHE_DIR)
 
-print("Final report generated successfully:", OUTPUT_FILE)
+#python input.py --trace etl_trace.json
+#python profiling.py etl_trace_old.json etl_trace.json
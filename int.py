@@ -1,45 +1,101 @@
 import streamlit as st
-import pandas as pd
 import os
+from functools import partial
+
+from encoding import encode_orders
+from export import EXPORT_FORMATS, export_table
+from metrics import dispatch_pivot, tat_pivot, tat_types, zone_pivot
+from parallel import sharded_aggregator
+from schema import INT_COLUMNS, OUTPUT_FILE, load_output_report
 
 st.set_page_config(page_title="Logistics TAT Analyzer", layout="wide")
 st.title("📦 Logistics TAT Pivot Dashboard")
 
+# Bigger tables show their top rows only; the export buttons carry everything
+DISPLAY_MAX_ROWS = 2_000
+
+
+def export_buttons(name, table, rows=None):
+    # Files are written on click, on Streamlit's download thread
+    for column, fmt in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS):
+        extension, mime = EXPORT_FORMATS[fmt]
+        column.download_button(
+            f"⬇️ {fmt}",
+            data=partial(export_table, table, fmt, rows),
+            file_name=f"{name}.{extension}",
+            mime=mime,
+            key=f"export_{name}_{fmt}",
+            on_click="ignore"
+        )
+
+
+def show_table(name, table):
+    if len(table) > DISPLAY_MAX_ROWS:
+        st.caption(f"Showing the first {DISPLAY_MAX_ROWS:,} of {len(table):,} rows – export for the full table")
+        st.dataframe(table.head(DISPLAY_MAX_ROWS), use_container_width=True)
+    else:
+        st.dataframe(table, use_container_width=True)
+    export_buttons(name, table)
+
 # ===============================
 # Load File
 # ===============================
-file_path = "Output_Report.csv"
+file_path = OUTPUT_FILE
 
 if not os.path.exists(file_path):
     st.error("❌ Output_Report.csv not found in project folder")
     st.stop()
 
-df = pd.read_csv(file_path)
+def data_version(path):
+    # Cached entries are keyed by the file's modification time and size
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
 
-# ===============================
-# Clean Data
-# ===============================
-df.columns = df.columns.str.strip()
-
-df["Final Status"] = df["Final Status"].astype(str).str.strip().str.upper()
-df["Reshipped"] = df["Reshipped"].astype(str).str.strip().str.upper()
-
-tat_status_cols = [
+STATUS_COLS = [
+    "Final Status",
+    "Reshipped",
     "Dispatch TAT Status",
     "Placed to Delivery TAT Status",
     "Consumer to Delivery TAT Status",
-    "Pickup to Delivery TAT Status"
+    "Pickup to Delivery TAT Status",
+    "E2E TAT Status"
 ]
 
-for col in tat_status_cols:
-    if col in df.columns:
-        df[col] = df[col].astype(str).str.strip().str.upper()
+@st.cache_resource(max_entries=1)
+def load_prepared(version):
+    # Read, typed and normalized once per data version, shared read-only
+    # by every rerun and session (cache_resource: no per-hit copy)
+    df = load_output_report(file_path, INT_COLUMNS)
+
+    # ===============================
+    # Clean Data
+    # ===============================
+    for col in STATUS_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().str.upper().astype("category")
+
+    return df
+
+# An evicted version shuts down its worker pool and frees its shared memory
+@st.cache_resource(
+    max_entries=1,
+    on_release=lambda orders: orders.aggregator and orders.aggregator.close()
+)
+def load_orders(version):
+    # Every pivot variable becomes dictionary-encoded codes; pivots count codes
+    df = load_prepared(version)
+    orders = encode_orders(df, dimensions=list(df.columns))
+    # Shared-memory shards for this version of the file (None on small data)
+    orders.aggregator = sharded_aggregator(orders)
+    return orders
+
+version = data_version(file_path)
+df = load_prepared(version)
+orders = load_orders(version)
 
 # ===============================
 # Date Filter (UNICOM Date)
 # ===============================
-df["UC Order Date (Date)"] = pd.to_datetime(df["UC Order Date (Date)"], errors="coerce")
-
 min_date = df["UC Order Date (Date)"].min()
 max_date = df["UC Order Date (Date)"].max()
 
@@ -48,137 +104,53 @@ start_date, end_date = st.date_input(
     [min_date, max_date]
 )
 
-df = df[
-    (df["UC Order Date (Date)"] >= pd.to_datetime(start_date)) &
-    (df["UC Order Date (Date)"] <= pd.to_datetime(end_date))
-]
-
-# ===============================
-# Constants
-# ===============================
-DELIVERED = ["DELIVERED"]
-TRANSIT = [
-    "IN-TRANSIT",
-    "IN-TRANSIT, DAMAGED/LOST",
-    "IN-TRANSIT, DELAYED",
-    "OUTFORPICKUP"
-]
-
-INTAT = ["INTAT"]
-OUTTAT = ["OUTTAT"]
-
-# ===============================
-# Helper Functions
-# ===============================
-def tat_pivot(df, group_col, tat_col):
-    base = df.groupby(group_col).agg(
-        Total_Orders=("UNICOM Order ID", "count")
-    )
-
-    base["% Volume"] = (base["Total_Orders"] / base["Total_Orders"].sum()) * 100
-
-    for label, statuses in {
-        "Delivered": DELIVERED,
-        "Transit": TRANSIT
-    }.items():
-        base[label] = df[df["Final Status"].isin(statuses)] \
-            .groupby(group_col)["UNICOM Order ID"].count()
-
-        base[f"{label} InTAT"] = df[
-            (df["Final Status"].isin(statuses)) &
-            (df[tat_col].isin(INTAT))
-        ].groupby(group_col)["UNICOM Order ID"].count()
-
-        base[f"{label} OutTAT"] = df[
-            (df["Final Status"].isin(statuses)) &
-            (df[tat_col].isin(OUTTAT))
-        ].groupby(group_col)["UNICOM Order ID"].count()
-
-    base = base.fillna(0).reset_index()
-
-    # Percentages
-    for col in base.columns:
-        if col.endswith("InTAT") or col.endswith("OutTAT"):
-            base[f"{col} %"] = (base[col] / base["Total_Orders"] * 100).round(2)
-
-    base["% Volume"] = base["% Volume"].round(2)
-
-    return base.sort_values("Total_Orders", ascending=False)
+rows = orders.date_between("UC Order Date (Date)", start_date, end_date)
 
 # ===============================
 # Pivot 1: Placed / Consumer / Pickup
 # ===============================
 tat_type = st.selectbox(
     "Select TAT Type",
-    [
-        "Placed to Delivery TAT",
-        "Consumer to Delivery TAT",
-        "Pickup to Delivery TAT"
-    ]
+    list(tat_types(orders))
 )
 
+pivot_columns = [col for col in df.columns if col in orders.codes]
 pivot_column = st.selectbox(
     "Select Pivot Variable",
-    df.columns.tolist()
+    pivot_columns,
+    index=pivot_columns.index("Facility") if "Facility" in pivot_columns else 0
 )
 
-tat_map = {
-    "Placed to Delivery TAT": "Placed to Delivery TAT Status",
-    "Consumer to Delivery TAT": "Consumer to Delivery TAT Status",
-    "Pickup to Delivery TAT": "Pickup to Delivery TAT Status"
-}
-
-pivot_df = tat_pivot(df, pivot_column, tat_map[tat_type])
+pivot_df = tat_pivot(orders, rows, pivot_column, tat_types(orders)[tat_type])
 
 st.subheader(f"📊 {tat_type} Pivot | {pivot_column}")
-st.dataframe(pivot_df, use_container_width=True)
+show_table("tat_pivot", pivot_df)
 
 # ===============================
 # Pivot 2: Dispatch TAT (Facility)
 # ===============================
 st.subheader("🚚 Dispatch TAT – Facility Level")
 
-dispatch = df.groupby("Facility").agg(
-    Total_Orders=("UNICOM Order ID", "count")
-)
-
-dispatch["% Volume"] = dispatch["Total_Orders"] / dispatch["Total_Orders"].sum() * 100
-
-dispatch["InTAT"] = df[df["Dispatch TAT Status"].isin(INTAT)] \
-    .groupby("Facility")["UNICOM Order ID"].count()
-
-dispatch["OutTAT"] = df[df["Dispatch TAT Status"].isin(OUTTAT)] \
-    .groupby("Facility")["UNICOM Order ID"].count()
-
-dispatch = dispatch.fillna(0).reset_index()
+dispatch = dispatch_pivot(orders, rows)
 
-dispatch["InTAT %"] = (dispatch["InTAT"] / dispatch["Total_Orders"] * 100).round(2)
-dispatch["OutTAT %"] = (dispatch["OutTAT"] / dispatch["Total_Orders"] * 100).round(2)
-dispatch["% Volume"] = dispatch["% Volume"].round(2)
-
-st.dataframe(dispatch, use_container_width=True)
+show_table("dispatch_pivot", dispatch)
 
 # ===============================
 # Pivot 3: Shipping Provider × Courier × Zone
 # ===============================
 st.subheader("📦 Pickup to Delivery TAT by Shipping Provider & Courier (Zone Wise)")
 
-zone_pivot = (
-    df.groupby(
-        ["Shipping provider", "Shipping Courier", "Zone"]
-    )
-    .agg(
-        Total_Orders=("UNICOM Order ID", "count"),
-        InTAT=("Pickup to Delivery TAT Status", lambda x: (x == "INTAT").sum()),
-        OutTAT=("Pickup to Delivery TAT Status", lambda x: (x == "OUTTAT").sum())
-    )
-    .reset_index()
-)
+zone_df = zone_pivot(orders, rows)
+
+show_table("zone_pivot", zone_df)
 
-zone_pivot["InTAT %"] = (zone_pivot["InTAT"] / zone_pivot["Total_Orders"] * 100).round(2)
-zone_pivot["OutTAT %"] = (zone_pivot["OutTAT"] / zone_pivot["Total_Orders"] * 100).round(2)
+# ===============================
+# Filtered Orders (export only)
+# ===============================
+st.subheader("🗂️ Filtered Orders")
+st.caption(f"{int(rows.sum()):,} orders in the selected date range – not rendered, export only")
 
-st.dataframe(zone_pivot, use_container_width=True)
+export_buttons("filtered_orders", df, rows)
 
 
 #python -m streamlit run int.py
@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+import numpy as np
+
+import metrics
+from encoding import NO_DAY, day_number
+
+# Prefix-sum index over the headline KPIs. Rows are grouped by the observed
+# combinations of app.py's filter columns; for every group the KPI counts
+# are accumulated day by day, so a date-range KPI is the difference of two
+# cumulative rows, summed over the groups the other filters select. Built
+# once per data load, it gives the same figures as metrics.compute_kpis.
+
+# ---------------- CONFIG ----------------
+DATE_COL = "UC Order Date (Date)"
+
+# filter_rows keyword -> encoded column
+INDEX_FILTERS = {
+    "facility": "Facility",
+    "courier": "Shipping Courier",
+    "zone": "Zone",
+    "status": "Final Status",
+}
+
+# groups × days × KPIs beyond this is left to the row scan
+INDEX_MAX_CELLS = 50_000_000
+
+
+class KpiIndex:
+
+    def __init__(self, orders, groups, group_codes, first_day, n_days):
+        self.orders = orders
+        self.group_codes = group_codes
+        self.first_day = first_day
+        self.n_days = n_days
+
+        masks = metrics.kpi_masks(orders, orders.all_rows())
+        self.names = list(masks)
+
+        days = orders.days[DATE_COL]
+        dated = days != NO_DAY
+        n_groups = len(next(iter(group_codes.values())))
+        cells = groups[dated].astype(np.int64) * n_days + (days[dated] - first_day)
+
+        dtype = np.int32 if orders.n_rows < np.iinfo(np.int32).max else np.int64
+        counts = np.stack([
+            np.bincount(cells[mask[dated]], minlength=n_groups * n_days)
+            for mask in masks.values()
+        ], axis=-1).reshape(n_groups, n_days, len(masks))
+
+        # cumulative[g, d] = counts of group g before day d
+        self.cumulative = np.zeros((n_groups, n_days + 1, len(masks)), dtype=dtype)
+        np.cumsum(counts, axis=1, out=self.cumulative[:, 1:])
+        self.total = self.cumulative.sum(axis=0)
+
+        # Orders without a UC date only count when no date range is set
+        self.undated = np.stack([
+            np.bincount(groups[~dated & mask], minlength=n_groups) for mask in masks.values()
+        ], axis=-1)
+
+    # ---------- lookups ----------
+    def day_bounds(self, date_range):
+        # Half-open [lo, hi) positions into the cumulative day axis
+        lo = day_number(date_range[0]) - self.first_day
+        hi = day_number(date_range[1]) - self.first_day + 1
+        lo, hi = (int(np.clip(bound, 0, self.n_days)) for bound in (lo, hi))
+        return lo, max(lo, hi)
+
+    def selected_groups(self, filters):
+        selected = None
+        for key, col in INDEX_FILTERS.items():
+            values = filters.get(key)
+            if not values:
+                continue
+            table = np.append(self.orders.labels[col].isin(values), False)
+            chosen = table[self.group_codes[col]]
+            selected = chosen if selected is None else selected & chosen
+        return selected
+
+    def kpis(self, date_range=None, **filters):
+        selected = self.selected_groups(filters)
+
+        if date_range:
+            lo, hi = self.day_bounds(date_range)
+            if selected is None:
+                counts = self.total[hi] - self.total[lo]
+            else:
+                cumulative = self.cumulative[selected]
+                counts = (cumulative[:, hi] - cumulative[:, lo]).sum(axis=0)
+        else:
+            undated = self.undated if selected is None else self.undated[selected]
+            cumulative = self.total[None] if selected is None else self.cumulative[selected]
+            counts = cumulative[:, -1].sum(axis=0) + undated.sum(axis=0)
+
+        return {name: int(count) for name, count in zip(self.names, counts)}
+
+
+def previous_period(date_range):
+    # Same number of days, ending the day before the range starts
+    start, end = date_range[0], date_range[1]
+    days = (end - start).days + 1
+    return (start - timedelta(days=days), start - timedelta(days=1))
+
+
+def kpi_deltas(kpis, previous):
+    # Count change, and percentage-point change for the share KPIs
+    deltas = {}
+    for name, count in kpis.items():
+        whole = metrics.KPI_SHARES.get(name)
+        share_change = None
+        if whole:
+            share_change = round(
+                metrics.pct(count, kpis[whole]) - metrics.pct(previous[name], previous[whole]), 1
+            )
+        deltas[name] = (count - previous[name], share_change)
+    return deltas
+
+
+def build_index(orders, max_cells=INDEX_MAX_CELLS):
+    # None when the columns are missing or the index would be too large
+    cols = list(INDEX_FILTERS.values())
+    if DATE_COL not in orders.days or any(col not in orders.codes for col in cols):
+        return None
+
+    days = orders.days[DATE_COL]
+    dated = days[days != NO_DAY]
+    first_day = int(dated.min()) if len(dated) else 0
+    n_days = int(dated.max()) - first_day + 1 if len(dated) else 1
+
+    # Groups are the observed combinations of the filter columns' codes
+    sizes = [len(orders.labels[col]) + 1 for col in cols]
+    combined = np.zeros(orders.n_rows, dtype=np.int64)
+    for col, size in zip(cols, sizes):
+        combined = combined * size + orders.codes[col]
+    keys, groups = np.unique(combined, return_inverse=True)
+
+    # Every headline KPI but the order total is a share of another
+    n_kpis = len(metrics.KPI_SHARES) + 1
+    if len(keys) * (n_days + 1) * n_kpis > max_cells:
+        return None
+
+    group_codes = dict(zip(cols, np.unravel_index(keys, sizes)))
+    return KpiIndex(orders, groups.reshape(-1), group_codes, first_day, n_days)
@@ -0,0 +1,472 @@
+import numpy as np
+import pandas as pd
+
+# KPI, pivot and chart aggregation logic shared by app.py, int.py and
+# report.py. Nothing in here imports Streamlit.
+
+# ---------------- CONSTANTS ----------------
+DELIVERED = ["DELIVERED"]
+TRANSIT = [
+    "IN-TRANSIT",
+    "IN-TRANSIT, DAMAGED/LOST",
+    "IN-TRANSIT, DELAYED",
+    "OUTFORPICKUP"
+]
+
+INTAT = ["INTAT"]
+OUTTAT = ["OUTTAT"]
+
+# Share KPIs shown next to their count: part -> whole
+KPI_SHARES = {
+    "rto_orders": "total_orders",
+    "reshipped_orders": "total_orders",
+    "delivered_orders": "total_orders",
+    "delivered_in_tat": "delivered_orders",
+    "delivered_out_tat": "delivered_orders",
+    "delivered_e2e_orders": "delivered_orders",
+    "delivered_e2e_in_tat": "delivered_e2e_orders",
+    "intransit_orders": "total_orders",
+    "intransit_in_tat": "intransit_orders",
+    "intransit_out_tat": "intransit_orders",
+}
+
+TAT_MAP = {
+    "Placed to Delivery TAT": "Placed to Delivery TAT Status",
+    "Consumer to Delivery TAT": "Consumer to Delivery TAT Status",
+    "Pickup to Delivery TAT": "Pickup to Delivery TAT Status",
+    "End-to-End Order TAT": "E2E TAT Status"
+}
+
+
+def tat_types(orders):
+    # TAT_MAP entries whose status column is in the data (older reports
+    # have no end-to-end columns)
+    return {name: col for name, col in TAT_MAP.items() if col in orders.codes}
+
+
+def pct(part, whole):
+    return round((part / whole) * 100, 1) if whole > 0 else 0
+
+
+# ---------------- LABEL MATCHING ----------------
+# Predicates run once per dictionary entry, so raw ("Delivered") and
+# int.py-normalized ("DELIVERED") labels both match.
+def normalized(labels):
+    return labels.astype(str).str.strip().str.upper()
+
+
+def status_in(orders, col, values):
+    return orders.label_mask(col, lambda labels: normalized(labels).isin(values))
+
+
+def status_startswith(orders, col, prefix):
+    return orders.label_mask(col, lambda labels: normalized(labels).str.startswith(prefix))
+
+
+# ---------------- FILTERS ----------------
+def filter_rows(orders, date_range=None, facility=None, courier=None, zone=None, status=None):
+    row_mask = orders.all_rows()
+
+    if date_range:
+        row_mask &= orders.date_between("UC Order Date (Date)", date_range[0], date_range[1])
+
+    if facility:
+        row_mask &= orders.isin("Facility", facility)
+
+    if courier:
+        row_mask &= orders.isin("Shipping Courier", courier)
+
+    if zone:
+        row_mask &= orders.isin("Zone", zone)
+
+    if status:
+        row_mask &= orders.isin("Final Status", status)
+
+    return row_mask
+
+
+# ---------------- HEADLINE KPIs ----------------
+def kpi_masks(orders, row_mask):
+    is_delivered = row_mask & status_in(orders, "Final Status", DELIVERED)
+    is_rto = row_mask & status_in(orders, "Final Status", ["RTO"])
+    is_intransit = row_mask & status_startswith(orders, "Final Status", "IN-TRANSIT")
+
+    masks = {
+        "total_orders": row_mask,
+        "delivered_orders": is_delivered,
+        "rto_orders": is_rto,
+        "intransit_orders": is_intransit,
+        "reshipped_orders": row_mask & False,
+        # Delivered SLA
+        "delivered_in_tat": is_delivered & status_in(orders, "Placed to Delivery TAT Status", INTAT),
+        "delivered_out_tat": is_delivered & status_in(orders, "Placed to Delivery TAT Status", OUTTAT),
+        # In-Transit SLA (Pickup → Delivery)
+        "intransit_in_tat": is_intransit & status_in(orders, "Pickup to Delivery TAT Status", INTAT),
+        "intransit_out_tat": is_intransit & status_in(orders, "Pickup to Delivery TAT Status", OUTTAT),
+        # Customer view across reshipments (first dispatch → final delivery),
+        # one row per order: its final shipment
+        "delivered_e2e_orders": row_mask & False,
+        "delivered_e2e_in_tat": row_mask & False,
+    }
+
+    if "E2E TAT Status" in orders.codes:
+        is_final = orders.flag("Final_Shipment_Flag") if "Final_Shipment_Flag" in orders.bits else True
+        masks["delivered_e2e_orders"] = is_delivered & is_final
+        masks["delivered_e2e_in_tat"] = masks["delivered_e2e_orders"] & status_in(
+            orders, "E2E TAT Status", INTAT
+        )
+
+    if "Reshipped_Flag" in orders.bits:
+        masks["reshipped_orders"] = orders.flag("Reshipped_Flag") & row_mask
+
+    return masks
+
+
+def compute_kpis(orders, row_mask):
+    return {name: int(mask.sum()) for name, mask in kpi_masks(orders, row_mask).items()}
+
+
+# ---------------- EXECUTIVE SUMMARY ----------------
+def risk_table(orders, row_mask, group_col):
+    # Delivered orders only, Out-TAT share per group
+    delivered = row_mask & orders.label_mask(
+        "Final Status", lambda labels: labels.astype(str).str.lower() == "delivered"
+    )
+    has_status = orders.label_mask(
+        "Placed to Delivery TAT Status", lambda labels: labels.notna()
+    )
+    is_outtat = orders.label_mask(
+        "Placed to Delivery TAT Status", lambda labels: labels.astype(str).str.lower() == "outtat"
+    )
+
+    risk = pd.DataFrame({
+        "total": orders.count_by(group_col, delivered & has_status),
+        "outtat": orders.count_by(group_col, delivered & is_outtat)
+    })
+    risk = risk.reindex(orders.count_by(group_col, delivered).index).fillna(0)
+    risk = risk.rename_axis(group_col).reset_index()
+
+    risk["outtat_pct"] = (risk["outtat"] / risk["total"] * 100).round(1)
+
+    return risk
+
+
+def executive_summary(orders, row_mask, kpis):
+    zone_risk = risk_table(orders, row_mask, "Zone")
+    courier_risk = risk_table(orders, row_mask, "Shipping Courier")
+
+    worst_zone_row = zone_risk.sort_values("outtat_pct", ascending=False).iloc[0]
+
+    return {
+        "overall_intat_pct": pct(kpis["delivered_in_tat"], kpis["delivered_orders"]),
+        "worst_zone": worst_zone_row["Zone"],
+        "worst_zone_pct": worst_zone_row["outtat_pct"],
+        "worst_courier": courier_risk.sort_values(
+            "outtat_pct", ascending=False
+        ).iloc[0]["Shipping Courier"],
+    }
+
+
+# ---------------- PIVOTS ----------------
+def tat_pivot(orders, rows, group_col, tat_col):
+    counted = rows & orders.flag("Has UNICOM Order ID")
+
+    base = pd.DataFrame(
+        {"Total_Orders": orders.count_by(group_col, counted)},
+        index=orders.count_by(group_col, rows).index
+    ).fillna(0).astype({"Total_Orders": int})
+
+    base["% Volume"] = (base["Total_Orders"] / base["Total_Orders"].sum()) * 100
+
+    for label, statuses in {
+        "Delivered": DELIVERED,
+        "Transit": TRANSIT
+    }.items():
+        in_status = counted & status_in(orders, "Final Status", statuses)
+
+        base[label] = orders.count_by(group_col, in_status)
+
+        base[f"{label} InTAT"] = orders.count_by(
+            group_col, in_status & status_in(orders, tat_col, INTAT)
+        )
+
+        base[f"{label} OutTAT"] = orders.count_by(
+            group_col, in_status & status_in(orders, tat_col, OUTTAT)
+        )
+
+    base = base.fillna(0).rename_axis(group_col).reset_index()
+
+    # Percentages
+    for col in base.columns:
+        if col.endswith("InTAT") or col.endswith("OutTAT"):
+            base[f"{col} %"] = (base[col] / base["Total_Orders"] * 100).round(2)
+
+    base["% Volume"] = base["% Volume"].round(2)
+
+    return base.sort_values("Total_Orders", ascending=False)
+
+
+def dispatch_pivot(orders, rows):
+    counted = rows & orders.flag("Has UNICOM Order ID")
+
+    dispatch = pd.DataFrame(
+        {"Total_Orders": orders.count_by("Facility", counted)},
+        index=orders.count_by("Facility", rows).index
+    ).fillna(0).astype({"Total_Orders": int})
+
+    dispatch["% Volume"] = dispatch["Total_Orders"] / dispatch["Total_Orders"].sum() * 100
+
+    dispatch["InTAT"] = orders.count_by(
+        "Facility", counted & status_in(orders, "Dispatch TAT Status", INTAT)
+    )
+
+    dispatch["OutTAT"] = orders.count_by(
+        "Facility", counted & status_in(orders, "Dispatch TAT Status", OUTTAT)
+    )
+
+    dispatch = dispatch.fillna(0).rename_axis("Facility").reset_index()
+
+    dispatch["InTAT %"] = (dispatch["InTAT"] / dispatch["Total_Orders"] * 100).round(2)
+    dispatch["OutTAT %"] = (dispatch["OutTAT"] / dispatch["Total_Orders"] * 100).round(2)
+    dispatch["% Volume"] = dispatch["% Volume"].round(2)
+
+    return dispatch
+
+
+def zone_pivot(orders, rows):
+    zone_keys = ["Shipping provider", "Shipping Courier", "Zone"]
+    tat_col = "Pickup to Delivery TAT Status"
+
+    pivot = pd.DataFrame(
+        {
+            "Total_Orders": orders.count_by(zone_keys, rows & orders.flag("Has UNICOM Order ID")),
+            "InTAT": orders.count_by(zone_keys, rows & status_in(orders, tat_col, INTAT)),
+            "OutTAT": orders.count_by(zone_keys, rows & status_in(orders, tat_col, OUTTAT))
+        },
+        index=orders.count_by(zone_keys, rows).index
+    ).fillna(0).astype(int).reset_index()
+
+    pivot["InTAT %"] = (pivot["InTAT"] / pivot["Total_Orders"] * 100).round(2)
+    pivot["OutTAT %"] = (pivot["OutTAT"] / pivot["Total_Orders"] * 100).round(2)
+
+    return pivot
+
+
+# ---------------- CHART AGGREGATIONS ----------------
+def delivered_only(filtered_df):
+    return filtered_df[filtered_df["Final Status"].str.lower() == "delivered"]
+
+
+def share_of(agg, group_col):
+    return (
+        agg["Count"] /
+        agg.groupby(group_col, observed=True)["Count"].transform("sum") * 100
+    ).round(1)
+
+
+# ---------------- TREND BUCKETING ----------------
+# Finest bucket (Day, then Week, then Month) that keeps the trend within
+# TREND_MAX_POINTS points
+TREND_MAX_POINTS = 120
+TREND_BUCKET_DAYS = {"Day": 1, "Week": 7, "Month": 30.44}
+
+# Rolling In-TAT % window, in buckets
+TREND_ROLLING = {"Day": 7, "Week": 4, "Month": 3}
+
+
+def trend_granularity(n_days, max_points=TREND_MAX_POINTS):
+    for granularity, bucket_days in TREND_BUCKET_DAYS.items():
+        if n_days / bucket_days <= max_points:
+            return granularity
+    return "Month"
+
+
+def bucket_start(days, granularity):
+    # days: datetime64[D] array; weeks start on Monday (1970-01-01 was a Thursday)
+    if granularity == "Week":
+        numbers = days.astype(np.int64)
+        return (numbers - (numbers + 3) % 7).astype("datetime64[D]")
+    if granularity == "Month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    return days
+
+
+def daily_counts(filtered_df):
+    # Delivered / delivered In-TAT orders per calendar day, gaps filled with 0
+    delivered = delivered_only(filtered_df)
+    status = delivered["Placed to Delivery TAT Status"]
+
+    days = delivered["UC Order Date (Date)"].to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    dated = ~np.isnat(days)
+    numbers = days[dated].astype(np.int64)
+
+    first = numbers.min() if len(numbers) else 0
+    offset = numbers - first
+    span = int(offset.max()) + 1 if len(numbers) else 0
+
+    counted = status.notna().to_numpy()[dated]
+    intat = (status.str.lower() == "intat").to_numpy(dtype=bool)[dated]
+
+    return pd.DataFrame(
+        {
+            "delivered_orders": np.bincount(offset, weights=counted, minlength=span).astype(np.int64),
+            "delivered_intat": np.bincount(offset, weights=intat, minlength=span).astype(np.int64),
+        },
+        index=pd.DatetimeIndex((first + np.arange(span)).astype("datetime64[D]"), name="order_date")
+    )
+
+
+def trend_agg(filtered_df, granularity=None):
+    daily = daily_counts(filtered_df)
+
+    if granularity is None:
+        granularity = trend_granularity(len(daily))
+
+    buckets = bucket_start(daily.index.values.astype("datetime64[D]"), granularity)
+    trend = daily.groupby(buckets).sum()
+
+    # Ratio of rolling sums, so busy buckets weigh more than quiet ones
+    rolling = trend.rolling(TREND_ROLLING[granularity], min_periods=1).sum()
+
+    trend["Delivered In-TAT %"] = (
+        trend["delivered_intat"] / trend["delivered_orders"] * 100
+    ).round(1)
+    trend["Rolling In-TAT %"] = (
+        rolling["delivered_intat"] / rolling["delivered_orders"] * 100
+    ).round(1)
+
+    trend = trend[trend["delivered_orders"] > 0].rename_axis("order_date").reset_index()
+    trend.attrs["granularity"] = granularity
+
+    return trend
+
+
+def pincode_density(filtered_df, pincode_master):
+    map_df_base = filtered_df.merge(
+        pincode_master,
+        left_on="Order Pincode",
+        right_on="pincode",
+        how="left"
+    )
+
+    return (
+        map_df_base
+        .dropna(subset=["latitude", "longitude"])
+        .groupby(["Order Pincode", "latitude", "longitude"], observed=True)
+        .size()
+        .reset_index(name="Orders")
+    )
+
+
+def sla_split(filtered_df, status_choice):
+    if status_choice == "Delivered":
+        sla_df = delivered_only(filtered_df)
+    else:
+        sla_df = filtered_df[
+            filtered_df["Final Status"].str.lower().str.startswith("in-transit")
+        ]
+
+    return (
+        sla_df
+        .groupby("Placed to Delivery TAT Status", observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+
+
+def dispatch_agg(filtered_df):
+    agg = (
+        filtered_df
+        .groupby(["Facility", "Dispatch TAT Status"], observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+    agg["Percentage"] = share_of(agg, "Facility")
+    return agg
+
+
+def delivery_agg(filtered_df):
+    agg = (
+        delivered_only(filtered_df)
+        .groupby(["Zone", "Placed to Delivery TAT Status"], observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+    agg["Percentage"] = share_of(agg, "Zone")
+    return agg
+
+
+def consumer_delivery_agg(filtered_df):
+    consumer_delivery_df = filtered_df[
+        filtered_df["Final Status"].astype(str).str.lower() == "delivered"
+    ]
+
+    agg = (
+        consumer_delivery_df
+        .groupby(["Zone", "Consumer to Delivery TAT Status"], observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+    agg["Percentage"] = share_of(agg, "Zone")
+    return agg
+
+
+def intransit_agg(filtered_df):
+    intransit_df = filtered_df[
+        filtered_df["Final Status"].str.lower().str.startswith("in-transit")
+    ]
+
+    agg = (
+        intransit_df
+        .groupby("Pickup to Delivery TAT Status", observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+
+    agg["Percentage"] = (agg["Count"] / agg["Count"].sum() * 100).round(1)
+    return agg
+
+
+def provider_perf(filtered_df):
+    return (
+        filtered_df
+        .groupby("Shipping provider", observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+
+
+def provider_sla(filtered_df):
+    return (
+        filtered_df
+        .groupby(["Shipping provider", "Placed to Delivery TAT Status"], observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+
+
+def courier_split(provider_df):
+    return (
+        provider_df
+        .groupby("Shipping Courier", observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+
+
+def courier_sla(provider_df):
+    return (
+        provider_df
+        .groupby(["Shipping Courier", "Placed to Delivery TAT Status"], observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+
+
+def zone_sla(filtered_df):
+    return (
+        delivered_only(filtered_df)
+        .groupby(["Zone", "Placed to Delivery TAT Status"], observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
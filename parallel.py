@@ -0,0 +1,145 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+# Sharded aggregation for EncodedOrders.count_by on very large data. The
+# code arrays are copied once into shared memory, ordered by Facility (or
+# Series) so every shard is a contiguous slice; a process pool computes
+# partial bincounts per shard and the partials are summed. Results are
+# identical to the single-process count_by. Only count_by goes through the
+# pool: the headline KPIs (metrics.compute_kpis) are boolean mask sums.
+
+# ---------------- CONFIG ----------------
+SHARD_COLUMNS = ["Facility", "Series"]
+PARALLEL_MIN_ROWS = 2_000_000
+SHARDS_PER_WORKER = 4
+
+ORDER = "__order__"
+MASK = "__mask__"
+
+
+# ---------------- SHARED MEMORY ----------------
+def share(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block, (block.name, array.dtype.str, len(array))
+
+
+def attach(name):
+    # Pool workers share the parent's resource tracker, and the parent unlinks
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+# ---------------- WORKER SIDE ----------------
+ATTACHED = {}
+
+
+def shared_array(spec):
+    name, dtype, length = spec
+    if name not in ATTACHED:
+        block = attach(name)
+        ATTACHED[name] = (block, np.ndarray((length,), dtype=dtype, buffer=block.buf))
+    return ATTACHED[name][1]
+
+
+def shard_counts(specs, start, end, cols, sizes, masked):
+    combined = np.zeros(end - start, dtype=np.int64)
+    for col, size in zip(cols, sizes):
+        combined *= size
+        combined += shared_array(specs[col])[start:end]
+
+    if masked:
+        # The mask is shared in row order; gather this shard's part here
+        rows = shared_array(specs[ORDER])[start:end]
+        combined = combined[shared_array(specs[MASK])[rows]]
+
+    return np.bincount(combined, minlength=int(np.prod(sizes)))
+
+
+# ---------------- SHARDS ----------------
+def shard_bounds(group_sizes, target):
+    # Cut at group boundaries, splitting groups bigger than `target`
+    bounds = []
+    start = 0
+    for size in group_sizes:
+        for offset in range(0, int(size), target):
+            bounds.append((start + offset, start + min(offset + target, int(size))))
+        start += int(size)
+    return bounds
+
+
+class ShardedAggregator:
+
+    def __init__(self, orders, shard_by="Facility", workers=None, min_rows=PARALLEL_MIN_ROWS):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+        self.n_rows = orders.n_rows
+
+        shard_codes = orders.codes[shard_by]
+        order = np.argsort(shard_codes, kind="stable")
+        order = order.astype(np.int32 if orders.n_rows < np.iinfo(np.int32).max else np.int64)
+
+        target = max(1, -(-orders.n_rows // (self.workers * SHARDS_PER_WORKER)))
+        self.shards = shard_bounds(np.bincount(shard_codes), target)
+
+        self.blocks = []
+        self.specs = {}
+        for col, codes in orders.codes.items():
+            self.add(col, codes[order])
+        self.add(ORDER, order)
+        mask_block = self.add(MASK, np.zeros(orders.n_rows, dtype=bool))
+        self.mask = np.ndarray((orders.n_rows,), dtype=bool, buffer=mask_block.buf)
+
+        # One shared mask buffer, so calls from several threads take turns
+        self.lock = threading.Lock()
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=get_context("spawn"))
+        atexit.register(self.close)
+
+    def add(self, key, array):
+        block, self.specs[key] = share(array)
+        self.blocks.append(block)
+        return block
+
+    def bincount(self, cols, sizes, mask=None):
+        specs = {key: self.specs[key] for key in [*cols, ORDER, MASK]}
+
+        with self.lock:
+            if mask is not None:
+                self.mask[:] = mask
+
+            partials = [
+                self.pool.submit(shard_counts, specs, start, end, cols, sizes, mask is not None)
+                for start, end in self.shards
+            ]
+            return sum(partial.result() for partial in partials)
+
+    def close(self):
+        if self.pool is None:
+            return
+        self.pool.shutdown(cancel_futures=True)
+        self.pool = None
+        self.mask = None
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def sharded_aggregator(orders, shard_by=None, workers=None, min_rows=PARALLEL_MIN_ROWS):
+    # None when the data is too small or there is a single core to use
+    workers = workers or os.cpu_count() or 1
+    if orders.n_rows < min_rows or workers < 2:
+        return None
+
+    shard_by = shard_by or next((col for col in SHARD_COLUMNS if col in orders.codes), None)
+    if shard_by is None:
+        return None
+
+    return ShardedAggregator(orders, shard_by, workers, min_rows)
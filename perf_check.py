@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import synth
+from profiling import peak_rss_mb
+
+# Performance regression check: drives app.py and int.py headlessly
+# (streamlit.testing AppTest) and runs input.py end-to-end on fixed
+# synthetic datasets, then fails when a latency or memory budget is
+# exceeded. The export.py scenario runs every int.py export format
+# through Streamlit's deferred download path. Every scenario runs in its
+# own interpreter so peak RSS and Streamlit caches are per scenario.
+# Fully offline, Linux/macOS.
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGETS_FILE = os.path.join(REPO_DIR, "perf_budgets.json")
+
+APP_TIMEOUT = 600
+
+
+def timed_run(at):
+    started = time.perf_counter()
+    at.run()
+    seconds = time.perf_counter() - started
+
+    if at.exception:
+        raise RuntimeError(f"script raised: {at.exception[0].message}")
+
+    return seconds
+
+
+# ---------------- SCENARIOS (child process) ----------------
+def scenario_app(script):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(REPO_DIR, script), default_timeout=APP_TIMEOUT)
+
+    result = {"cold_run_s": timed_run(at)}
+    result["full_rerun_s"] = timed_run(at)
+
+    widget_changes = []
+    if script == "app.py":
+        at.radio[0].set_value("In-Transit")
+        widget_changes.append(timed_run(at))
+
+        zones = at.sidebar.multiselect[2]
+        zones.set_value(zones.options[:2])
+        widget_changes.append(timed_run(at))
+
+        at.selectbox[0].set_value(at.selectbox[0].options[-1])
+        widget_changes.append(timed_run(at))
+    else:
+        at.selectbox[1].set_value("Zone")
+        widget_changes.append(timed_run(at))
+
+        at.selectbox[0].set_value(at.selectbox[0].options[-1])
+        widget_changes.append(timed_run(at))
+
+    result["widget_change_s"] = max(widget_changes)
+    return result
+
+
+def scenario_export():
+    # The full int.py table through Streamlit's deferred download path, once
+    # per format; an unsupported return type raises MediaFileStorageError
+    from functools import partial
+
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    from export import EXPORT_FORMATS, export_table
+    from schema import INT_COLUMNS, OUTPUT_FILE, load_output_report
+
+    df = load_output_report(OUTPUT_FILE, INT_COLUMNS)
+    manager = MediaFileManager(MemoryMediaFileStorage("/media"))
+
+    started = time.perf_counter()
+    for fmt, (extension, mime) in EXPORT_FORMATS.items():
+        file_id = manager.add_deferred(
+            partial(export_table, df, fmt), mime, "export", f"export.{extension}"
+        )
+        manager.execute_deferred(file_id)
+    return {"export_s": time.perf_counter() - started}
+
+
+def scenario_input():
+    import input as etl
+
+    started = time.perf_counter()
+    # The default configuration, as a plain `python input.py` runs it
+    etl.main()
+    return {"end_to_end_s": time.perf_counter() - started}
+
+
+def run_scenario(name):
+    if name == "input.py":
+        result = scenario_input()
+    elif name == "export.py":
+        result = scenario_export()
+    else:
+        result = scenario_app(name)
+
+    result = {key: round(value, 3) for key, value in result.items()}
+    result["peak_mb"] = peak_rss_mb()
+    return result
+
+
+# ---------------- HARNESS (parent process) ----------------
+def load_budgets(path=BUDGETS_FILE):
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def prepare_datasets(budgets, base_dir):
+    paths = {}
+    for name, spec in budgets["datasets"].items():
+        path = os.path.join(base_dir, name)
+        synth.write_dataset(path, spec["rows"], seed=spec.get("seed", 0), excel=spec.get("excel", False))
+        paths[name] = path
+    return paths
+
+
+def measure(script, data_dir):
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--scenario", script],
+        cwd=data_dir,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": REPO_DIR},
+    )
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"{script} scenario failed:\n{completed.stderr[-2000:]}")
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check(budgets, data_dirs):
+    rows = []
+    failures = 0
+
+    for script, per_dataset in budgets["budgets"].items():
+        for dataset, limits in per_dataset.items():
+            measured = measure(script, data_dirs[dataset])
+
+            for metric, limit in limits.items():
+                value = measured.get(metric)
+                ok = value is not None and value <= limit
+                failures += not ok
+                rows.append((script, dataset, metric, value, limit, "ok" if ok else "OVER BUDGET"))
+
+            for metric, value in measured.items():
+                if metric not in limits:
+                    rows.append((script, dataset, metric, value, None, "info"))
+
+    print(f"{'script':<10}{'dataset':<9}{'metric':<18}{'measured':>10}{'budget':>10}  result")
+    for script, dataset, metric, value, limit, verdict in rows:
+        budget = "" if limit is None else f"{limit:>10}"
+        print(f"{script:<10}{dataset:<9}{metric:<18}{value:>10}{budget:>10}  {verdict}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when dashboard / ETL latency or memory exceed budgets")
+    parser.add_argument("--budgets", default=BUDGETS_FILE)
+    parser.add_argument("--data-dir", default=None, help="keep the generated datasets here")
+    parser.add_argument("--scenario", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario)))
+        return
+
+    budgets = load_budgets(args.budgets)
+
+    if args.data_dir:
+        failures = check(budgets, prepare_datasets(budgets, args.data_dir))
+    else:
+        with tempfile.TemporaryDirectory() as base_dir:
+            failures = check(budgets, prepare_datasets(budgets, base_dir))
+
+    if failures:
+        print(f"{failures} budget(s) exceeded")
+        sys.exit(1)
+
+    print("All performance budgets met")
+
+
+if __name__ == "__main__":
+    main()
+
+#python perf_check.py
@@ -0,0 +1,154 @@
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Per-stage instrumentation: wall time, CPU time, rows in/out and the
+# process's peak RSS so far for each named stage, with a JSON trace per
+# run. Peak traced memory per stage (tracemalloc) is opt-in: it slows
+# pandas-heavy stages several times over.
+
+MB = 1024 * 1024
+
+
+def row_count(value):
+    return len(value) if isinstance(value, pd.DataFrame) else None
+
+
+def peak_rss_mb():
+    # VmHWM belongs to this process image; ru_maxrss survives fork+exec on Linux
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+
+    # ru_maxrss is KB on Linux, bytes on macOS; not available on Windows
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (MB if sys.platform == "darwin" else 1024), 1)
+
+
+class StageProfiler:
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.started = datetime.now()
+        self.stages = []
+
+    def run(self, name, fn, *args, **kwargs):
+        rows_in = row_count(args[0]) if args else None
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        result = fn(*args, **kwargs)
+
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        peak_mb = None
+        if self.trace_memory:
+            peak_mb = round((tracemalloc.get_traced_memory()[1] - memory_before) / MB, 2)
+
+        self.stages.append({
+            "stage": name,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "rows_in": rows_in,
+            "rows_out": row_count(result),
+            "peak_mb": peak_mb,
+            "rss_peak_mb": peak_rss_mb(),
+        })
+
+        return result
+
+    def stop(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # ---------------- REPORTING ----------------
+    def table(self):
+        table = pd.DataFrame(self.stages).set_index("stage")
+        table.loc["TOTAL"] = {
+            "wall_s": round(table["wall_s"].sum(), 4),
+            "cpu_s": round(table["cpu_s"].sum(), 4),
+            "peak_mb": table["peak_mb"].max(),
+            "rss_peak_mb": table["rss_peak_mb"].max(),
+        }
+        return table.astype({"rows_in": "Int64", "rows_out": "Int64"})
+
+    def summary(self):
+        return self.table().to_string(na_rep="")
+
+    def trace(self, **context):
+        return {
+            "run": {
+                "started": self.started.isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "trace_memory": self.trace_memory,
+                **context,
+            },
+            "stages": self.stages,
+        }
+
+    def write_trace(self, path, **context):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.trace(**context), handle, indent=2, default=str)
+
+
+# ---------------- COMPARE RUNS ----------------
+def load_trace(path):
+    with open(path, encoding="utf-8") as handle:
+        stages = pd.DataFrame(json.load(handle)["stages"]).set_index("stage")
+    # Traces written before per-stage RSS have no rss_peak_mb
+    return stages.reindex(columns=[*stages.columns.drop("rss_peak_mb", errors="ignore"), "rss_peak_mb"])
+
+
+def compare_traces(old_path, new_path):
+    old = load_trace(old_path)
+    new = load_trace(new_path)
+
+    compared = pd.DataFrame({
+        "old_wall_s": old["wall_s"],
+        "new_wall_s": new["wall_s"],
+        "old_peak_mb": old["peak_mb"],
+        "new_peak_mb": new["peak_mb"],
+        "old_rss_peak_mb": old["rss_peak_mb"],
+        "new_rss_peak_mb": new["rss_peak_mb"],
+        "old_rows_out": old["rows_out"],
+        "new_rows_out": new["rows_out"],
+    }).reindex(list(dict.fromkeys([*old.index, *new.index])))
+
+    compared["wall_ratio"] = (compared["new_wall_s"] / compared["old_wall_s"]).round(2)
+
+    return compared
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python profiling.py OLD_TRACE.json NEW_TRACE.json")
+
+    print(compare_traces(sys.argv[1], sys.argv[2]).to_string(na_rep=""))
+
+#python profiling.py etl_trace_old.json etl_trace.json
@@ -0,0 +1,176 @@
+import json
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Opt-in render profiler for app.py: per-section aggregation / figure /
+# render timings, payload size and per-section cache hit/miss, with a
+# rolling history per session.
+
+HISTORY_KEY = "render_profiler_history"
+MEMO_KEY = "render_profiler_memo"
+HISTORY_SIZE = 50
+
+KB = 1024
+
+
+def timed_call(fn, *args):
+    # Runs on a worker thread, so no st.* calls and no session state here
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def payload_bytes(obj):
+    # Plotly figures go to the browser as JSON, frames as Arrow
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if hasattr(obj, "to_plotly_json"):
+        return len(obj.to_json())
+    return 0
+
+
+class Section:
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.record = {
+            "section": name,
+            "aggregate_s": 0.0,
+            "figure_s": 0.0,
+            "render_s": 0.0,
+            "total_s": 0.0,
+            "payload_kb": 0.0,
+            "cache": "",
+        }
+
+    def aggregate(self, fn, *args, key=(), shared=False):
+        # Reuse the last result while the filter state and key are unchanged;
+        # shared results (one per fn and key) are reused by every section
+        memo = st.session_state.setdefault(MEMO_KEY, {})
+        memo_slot = ("shared", fn.__name__, key) if shared else (self.name, fn.__name__)
+        memo_key = (self.profiler.state_key, key)
+
+        started = time.perf_counter()
+
+        cached = memo.get(memo_slot)
+        prefetched = self.profiler.prefetched.pop(memo_slot, None)
+
+        if cached is not None and cached[0] == memo_key:
+            result = cached[1]
+            hit = "hit"
+            seconds = time.perf_counter() - started
+        elif prefetched is not None and prefetched[0] == memo_key:
+            # Computed on a worker thread by RenderProfiler.submit; count the
+            # worker's compute time rather than the time spent waiting here
+            result, seconds = prefetched[1].result()
+            memo[memo_slot] = (memo_key, result)
+            hit = "miss"
+        else:
+            result = fn(*args)
+            memo[memo_slot] = (memo_key, result)
+            hit = "miss"
+            seconds = time.perf_counter() - started
+
+        self.record["aggregate_s"] += seconds
+        self.record["cache"] = hit if self.record["cache"] in ("", hit) else "partial"
+
+        return result
+
+    def figure(self, fn, *args):
+        started = time.perf_counter()
+        fig = fn(*args)
+        self.record["figure_s"] += time.perf_counter() - started
+        return fig
+
+    def render(self, fn, obj, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(obj, *args, **kwargs)
+        self.record["render_s"] += time.perf_counter() - started
+
+        if self.profiler.enabled:
+            self.record["payload_kb"] += payload_bytes(obj) / KB
+
+        return result
+
+
+class RenderProfiler:
+
+    def __init__(self, enabled, state_key):
+        self.enabled = enabled
+        self.state_key = state_key
+        self.started = time.perf_counter()
+        self.records = []
+        self.prefetched = {}
+
+    def submit(self, executor, name, fn, *args, key=()):
+        # Start section `name`'s `fn(*args)` on the executor now; the
+        # matching section.aggregate(fn, ...) call later collects it
+        memo = st.session_state.setdefault(MEMO_KEY, {})
+        memo_slot = (name, fn.__name__)
+        memo_key = (self.state_key, key)
+
+        cached = memo.get(memo_slot)
+        if cached is not None and cached[0] == memo_key:
+            future = Future()
+            future.set_result((cached[1], 0.0))
+            return future
+
+        future = executor.submit(timed_call, fn, *args)
+        self.prefetched[memo_slot] = (memo_key, future)
+        return future
+
+    @contextmanager
+    def section(self, name):
+        section = Section(self, name)
+        started = time.perf_counter()
+        try:
+            yield section
+        finally:
+            section.record["total_s"] = time.perf_counter() - started
+            self.records.append(section.record)
+
+    def finish(self):
+        run = {
+            "run_at": datetime.now().isoformat(timespec="seconds"),
+            "total_s": round(time.perf_counter() - self.started, 4),
+            "sections": [
+                {key: round(value, 4) if isinstance(value, float) else value for key, value in record.items()}
+                for record in self.records
+            ],
+        }
+
+        history = st.session_state.setdefault(HISTORY_KEY, [])
+        history.append(run)
+        del history[:-HISTORY_SIZE]
+
+        if self.enabled:
+            self.render_panel(run, history)
+
+    # ---------------- DEBUG PANEL ----------------
+    def render_panel(self, run, history):
+        with st.expander("⏱ Render Profiler", expanded=True):
+            st.caption(f"Full rerun: {run['total_s']}s · {len(history)} runs kept this session")
+
+            st.dataframe(
+                pd.DataFrame(run["sections"]).sort_values("total_s", ascending=False),
+                use_container_width=True,
+                hide_index=True
+            )
+
+            trend = pd.DataFrame(
+                [{"run": i + 1, **record} for i, past in enumerate(history) for record in past["sections"]]
+            )
+            st.line_chart(trend.pivot_table(index="run", columns="section", values="total_s"))
+
+            st.download_button(
+                "Export history (JSON)",
+                json.dumps(history, indent=2),
+                file_name="render_profile.json",
+                mime="application/json"
+            )
@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+import charts
+import metrics
+from encoding import encode_orders
+from schema import (
+    APP_COLUMNS,
+    INT_COLUMNS,
+    OUTPUT_FILE,
+    PINCODE_FILE,
+    load_output_report,
+    load_pincode_master,
+)
+
+# Headless SLA pack: KPI tables, pivots and charts for every
+# Facility × Shipping provider slice, rendered in a process pool.
+
+# ---------------- CONFIG ----------------
+REPORT_COLUMNS = list(dict.fromkeys(APP_COLUMNS + INT_COLUMNS))
+
+REPORT_PIVOTS = [
+    "Zone",
+    "Shipping Courier",
+    "Series",
+    "Payment method",
+]
+
+ALL = "ALL"
+
+# Worker state, set once per process by init_worker
+WORKER = {}
+
+
+def slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(text)).strip("_").lower() or "blank"
+
+
+# ---------------- SLICES ----------------
+def report_slices(orders):
+    slices = [(ALL, ALL)]
+    pairs = orders.count_by(["Facility", "Shipping provider"]).index
+    slices.extend((facility, provider) for facility, provider in pairs)
+    return slices
+
+
+def slice_rows(orders, facility, provider):
+    rows = orders.all_rows()
+    if facility != ALL:
+        rows &= orders.isin("Facility", [facility])
+    if provider != ALL:
+        rows &= orders.isin("Shipping provider", [provider])
+    return rows
+
+
+# ---------------- WORKER ----------------
+def init_worker(df, pincode_master, out_dir, images):
+    WORKER["df"] = df
+    WORKER["orders"] = encode_orders(
+        df, dimensions=[col for col in df.columns if col != "UNICOM Order ID"]
+    )
+    WORKER["pincode"] = pincode_master
+    WORKER["out_dir"] = out_dir
+    WORKER["images"] = images
+
+
+def slice_figures(slice_df, pincode_master):
+    figures = {
+        "trend": charts.trend_figure(metrics.trend_agg(slice_df)),
+        "delivered_sla": charts.sla_pie_figure(metrics.sla_split(slice_df, "Delivered"), "Delivered"),
+        "intransit_sla": charts.sla_pie_figure(metrics.sla_split(slice_df, "In-Transit"), "In-Transit"),
+        "status": charts.status_pie_figure(slice_df),
+        "dispatch": charts.dispatch_figure(metrics.dispatch_agg(slice_df)),
+        "delivery": charts.delivery_figure(metrics.delivery_agg(slice_df)),
+        "consumer_delivery": charts.consumer_delivery_figure(metrics.consumer_delivery_agg(slice_df)),
+        "intransit": charts.intransit_figure(metrics.intransit_agg(slice_df)),
+        "provider": charts.provider_pie_figure(metrics.provider_perf(slice_df)),
+        "provider_sla": charts.provider_sla_figure(metrics.provider_sla(slice_df)),
+    }
+
+    if pincode_master is not None:
+        figures["density_map"] = charts.density_map_figure(
+            metrics.pincode_density(slice_df, pincode_master)
+        )
+
+    return figures
+
+
+def write_charts_page(path, title, figures):
+    parts = [fig.to_html(full_html=False, include_plotlyjs=False) for fig in figures.values()]
+
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(
+            "<html><head><meta charset='utf-8'>"
+            f"<title>{title}</title>"
+            "<script src='../plotly.min.js'></script></head><body>"
+            f"<h1>{title}</h1>{''.join(parts)}</body></html>"
+        )
+
+
+def render_slice(number, facility, provider):
+    started = time.perf_counter()
+
+    df = WORKER["df"]
+    orders = WORKER["orders"]
+
+    rows = slice_rows(orders, facility, provider)
+    slice_df = df[rows]
+
+    # Numbered so labels that only differ in whitespace get their own folder
+    name = f"{number:03d}__{slug(facility)}__{slug(provider)}"
+    slice_dir = os.path.join(WORKER["out_dir"], name)
+    os.makedirs(slice_dir, exist_ok=True)
+
+    # KPI tables
+    kpis = metrics.compute_kpis(orders, rows)
+    if kpis["delivered_orders"] > 0:
+        kpis.update(metrics.executive_summary(orders, rows, kpis))
+
+    with open(os.path.join(slice_dir, "kpis.json"), "w", encoding="utf-8") as handle:
+        json.dump(kpis, handle, indent=2, default=str)
+
+    # tat_pivot for every TAT type × pivot variable
+    for tat_type, tat_col in metrics.tat_types(orders).items():
+        for pivot_col in REPORT_PIVOTS:
+            if pivot_col in orders.codes:
+                metrics.tat_pivot(orders, rows, pivot_col, tat_col).to_csv(
+                    os.path.join(slice_dir, f"tat_pivot__{slug(tat_type)}__{slug(pivot_col)}.csv"),
+                    index=False
+                )
+
+    # Dispatch / zone pivots
+    metrics.dispatch_pivot(orders, rows).to_csv(
+        os.path.join(slice_dir, "dispatch_pivot.csv"), index=False
+    )
+    metrics.zone_pivot(orders, rows).to_csv(
+        os.path.join(slice_dir, "zone_pivot.csv"), index=False
+    )
+
+    # Charts
+    if len(slice_df):
+        figures = slice_figures(slice_df, WORKER["pincode"])
+        write_charts_page(
+            os.path.join(slice_dir, "charts.html"), f"{facility} × {provider}", figures
+        )
+
+        if WORKER["images"]:
+            for chart_name, fig in figures.items():
+                fig.write_image(os.path.join(slice_dir, f"{chart_name}.png"))
+
+    return {
+        "Facility": facility,
+        "Shipping provider": provider,
+        "folder": name,
+        "seconds": round(time.perf_counter() - started, 3),
+        **kpis,
+    }
+
+
+# ---------------- BUNDLE ----------------
+def write_index(out_dir, summary):
+    summary.to_csv(os.path.join(out_dir, "kpis.csv"), index=False)
+
+    links = summary.assign(
+        folder=summary["folder"].map(lambda folder: f"<a href='{folder}/charts.html'>{folder}</a>")
+    )
+
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as handle:
+        handle.write(
+            "<html><head><meta charset='utf-8'><title>SLA Pack</title></head><body>"
+            "<h1>SLA Pack – Facility × Shipping provider</h1>"
+            f"{links.to_html(index=False, escape=False)}</body></html>"
+        )
+
+
+def build_report(input_file, pincode_file, out_dir, workers=None, images=False):
+    df = load_output_report(input_file, REPORT_COLUMNS)
+    orders = encode_orders(df, dimensions=["Facility", "Shipping provider"])
+
+    pincode_master = load_pincode_master(pincode_file) if os.path.exists(pincode_file) else None
+
+    if images:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            print("kaleido not installed – skipping PNG chart images")
+            images = False
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "plotly.min.js"), "w", encoding="utf-8") as handle:
+        handle.write(get_plotlyjs())
+
+    slices = report_slices(orders)
+    results = []
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(df, pincode_master, out_dir, images)
+    ) as pool:
+        futures = [
+            pool.submit(render_slice, number, facility, provider)
+            for number, (facility, provider) in enumerate(slices)
+        ]
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"{result['folder']:<48} {result['total_orders']:>9} orders  {result['seconds']:>7.2f}s")
+
+    summary = pd.DataFrame(results).sort_values("folder")
+    write_index(out_dir, summary)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the per-facility / per-provider SLA pack")
+    parser.add_argument("--input", default=OUTPUT_FILE)
+    parser.add_argument("--pincode", default=PINCODE_FILE)
+    parser.add_argument("--out", default="sla_pack")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--images", action="store_true", help="also write PNG charts (needs kaleido)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = build_report(args.input, args.pincode, args.out, args.workers, args.images)
+
+    print(f"{len(summary)} slices written to {args.out} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
+
+#python report.py --input Output_Report.csv --out sla_pack --workers 8
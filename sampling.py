@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+import metrics
+from encoding import NO_DAY
+
+# Fast-preview estimates for app.py: a fixed row sample stratified by
+# Zone x Shipping provider, drawn once at load time. KPI counts and
+# In-TAT shares are estimated from it with 95% confidence intervals
+# (stratified Horvitz-Thompson totals, linearized ratio variance).
+
+# ---------------- CONFIG ----------------
+STRATA = ["Zone", "Shipping provider"]
+SAMPLE_FRACTION = 0.05
+MIN_PER_STRATUM = 30
+Z_95 = 1.96
+
+
+# ---------------- SAMPLE ----------------
+class StratifiedSample:
+
+    def __init__(self, orders, rows, strata, population, taken):
+        self.orders = orders          # EncodedOrders of the sampled rows only
+        self.rows = rows              # row positions in the full data
+        self.strata = strata          # stratum of every sampled row
+        self.population = population  # rows per stratum in the full data
+        self.taken = taken            # sampled rows per stratum
+
+    @property
+    def fraction(self):
+        return len(self.rows) / max(int(self.population.sum()), 1)
+
+
+def stratified_sample(orders, columns=STRATA, fraction=SAMPLE_FRACTION,
+                      min_per_stratum=MIN_PER_STRATUM, seed=0):
+    # Null codes are their own stratum, so every row belongs to one
+    columns = [col for col in columns if col in orders.codes]
+
+    combined = np.zeros(orders.n_rows, dtype=np.int64)
+    for col in columns:
+        combined = combined * (len(orders.labels[col]) + 1) + orders.codes[col]
+
+    _, stratum = np.unique(combined, return_inverse=True)
+    population = np.bincount(stratum)
+    taken = np.minimum(population, np.maximum(min_per_stratum, np.ceil(population * fraction))).astype(np.int64)
+
+    # Random order inside each stratum, keep the first `taken` rows of each
+    priority = np.random.default_rng(seed).random(orders.n_rows)
+    order = np.lexsort((priority, stratum))
+    starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+    rank = np.arange(orders.n_rows) - starts[stratum[order]]
+
+    rows = np.sort(order[rank < taken[stratum[order]]])
+
+    return StratifiedSample(orders.take(rows), rows, stratum[rows], population, taken)
+
+
+# ---------------- ESTIMATORS ----------------
+def stratum_sums(sample, group, values, n_groups):
+    # Per (group, stratum) sum and sum of squares; rows outside every group
+    # (group < 0) still count towards the stratum sample size
+    inside = group >= 0
+    cells = group[inside] * len(sample.population) + sample.strata[inside]
+    values = values[inside]
+
+    size = n_groups * len(sample.population)
+    s1 = np.bincount(cells, weights=values, minlength=size).reshape(n_groups, -1)
+    s2 = np.bincount(cells, weights=values * values, minlength=size).reshape(n_groups, -1)
+    return s1, s2
+
+
+def total_and_variance(sample, s1, s2):
+    n = sample.taken
+    N = sample.population
+
+    total = (N / n * s1).sum(axis=1)
+    spread = (s2 - s1 ** 2 / n) / np.maximum(n - 1, 1)
+    variance = (N ** 2 * (1 - n / N) * spread / n).sum(axis=1)
+    return total, variance
+
+
+def estimate_total(sample, group, y, n_groups=1):
+    total, variance = total_and_variance(sample, *stratum_sums(sample, group, y, n_groups))
+    return total, Z_95 * np.sqrt(variance)
+
+
+def estimate_ratio(sample, group, y, x, n_groups=1):
+    # sum(y) / sum(x) per group, variance from the residuals y - ratio * x
+    y_total, _ = total_and_variance(sample, *stratum_sums(sample, group, y, n_groups))
+    x_total, _ = total_and_variance(sample, *stratum_sums(sample, group, x, n_groups))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(x_total > 0, y_total / x_total, 0.0)
+
+    residual = y - ratio[np.maximum(group, 0)] * x
+    _, variance = total_and_variance(sample, *stratum_sums(sample, group, residual, n_groups))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        half_width = np.where(x_total > 0, Z_95 * np.sqrt(variance) / x_total, 0.0)
+
+    return ratio, half_width
+
+
+# ---------------- PREVIEW KPIs ----------------
+def estimate_kpis(sample, sample_mask):
+    # {kpi: (count, ±count, share %, ±share %)}; share is None for totals
+    masks = metrics.kpi_masks(sample.orders, sample_mask)
+    group = np.zeros(sample.orders.n_rows, dtype=np.int64)
+
+    estimates = {}
+    for name, mask in masks.items():
+        count, count_ci = estimate_total(sample, group, mask.astype(float))
+        share, share_ci = None, None
+
+        if name in metrics.KPI_SHARES:
+            whole = masks[metrics.KPI_SHARES[name]].astype(float)
+            ratio, ratio_ci = estimate_ratio(sample, group, mask.astype(float), whole)
+            share, share_ci = round(ratio[0] * 100, 1), round(ratio_ci[0] * 100, 1)
+
+        estimates[name] = (int(round(count[0])), int(round(count_ci[0])), share, share_ci)
+
+    return estimates
+
+
+def estimate_trend(sample, sample_mask, granularity=None):
+    # Same columns as metrics.trend_agg plus the "CI" half-width in % points
+    orders = sample.orders
+    delivered = sample_mask & orders.label_mask(
+        "Final Status", lambda labels: labels.astype(str).str.lower() == "delivered"
+    )
+    has_status = orders.label_mask("Placed to Delivery TAT Status", lambda labels: labels.notna())
+    is_intat = orders.label_mask(
+        "Placed to Delivery TAT Status", lambda labels: labels.astype(str).str.lower() == "intat"
+    )
+
+    days = orders.days["UC Order Date (Date)"]
+    counted = delivered & (days != NO_DAY)
+
+    # Same buckets as metrics.trend_agg would pick for this range
+    if granularity is None:
+        span = int(np.ptp(days[counted])) + 1 if counted.any() else 0
+        granularity = metrics.trend_granularity(span)
+
+    buckets = metrics.bucket_start(days[counted].astype("datetime64[D]"), granularity)
+    bucket_values, bucket_group = np.unique(buckets, return_inverse=True)
+    group = np.full(orders.n_rows, -1, dtype=np.int64)
+    group[counted] = bucket_group
+
+    x = (delivered & has_status).astype(float)
+    y = (delivered & is_intat).astype(float)
+
+    n_groups = len(bucket_values)
+    delivered_orders, _ = estimate_total(sample, group, x, n_groups)
+    delivered_intat, _ = estimate_total(sample, group, y, n_groups)
+    ratio, half_width = estimate_ratio(sample, group, y, x, n_groups)
+
+    trend = pd.DataFrame({
+        "order_date": pd.to_datetime(bucket_values),
+        "delivered_orders": delivered_orders.round().astype(int),
+        "delivered_intat": delivered_intat.round().astype(int),
+        "Delivered In-TAT %": (ratio * 100).round(1),
+        "CI": (half_width * 100).round(1),
+    })
+    trend.attrs["granularity"] = granularity
+
+    return trend
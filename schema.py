@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+from dateparse import parse_date_columns
+
+# ---------------- OUTPUT REPORT SCHEMA ----------------
+# Column dtypes for Output_Report.csv as written by input.py.
+# Dates are written as DD-MM-YYYY strings and parsed after the read.
+OUTPUT_FILE = "Output_Report.csv"
+OUTPUT_DATE_FORMAT = "%d-%m-%Y"
+
+CATEGORY = "category"
+DATE = "datetime"
+TEXT = "object"
+DAYS = "Int32"
+
+OUTPUT_SCHEMA = {
+    "Devx Order ID": TEXT,
+    "Devx Order Date (Date)": DATE,
+    "Devx Order Status": CATEGORY,
+    "Payment method": CATEGORY,
+    "UC Order Date (Date)": DATE,
+    "Ideal Dispatch Date": DATE,
+    "Ideal Dispatch Date(R)": DATE,
+    "Facility": CATEGORY,
+    "Series": CATEGORY,
+    "Facility Type": CATEGORY,
+    "Shipping Address City": CATEGORY,
+    "Order Pincode": "Int32",
+    "UC Order Status": CATEGORY,
+    "UC Shipping Package Status": CATEGORY,
+    "Dispatch Date (Date)": DATE,
+    "UNICOM Order ID": TEXT,
+    "Shipping provider": CATEGORY,
+    "Shipping Courier": CATEGORY,
+    "Tracking No.": TEXT,
+    "Assigned Date_D": DATE,
+    "CP Order Status": CATEGORY,
+    "Pickup Date (Date)": DATE,
+    "Delivery Date (Date)": DATE,
+    "Final Status": CATEGORY,
+    "Zone": CATEGORY,
+    "Reshipped": CATEGORY,
+    "Week": "Int8",
+    "Calculated Ideal Delivery TAT": DAYS,
+    "Ideal Placed to Delivery TAT": DAYS,
+    "Consumer Placed to Delivery TAT": DAYS,
+    "Dispatch TAT": DAYS,
+    "Dispatch TAT Status": CATEGORY,
+    "Placed to Delivery TAT": DAYS,
+    "Placed to Delivery TAT Status": CATEGORY,
+    "Consumer to Delivery TAT Status": CATEGORY,
+    "Pickup to Delivery TAT": DAYS,
+    "Pickup to Delivery TAT Status": CATEGORY,
+    "Shipments": "Int16",
+    "Final Shipment": CATEGORY,
+    "E2E Order to Delivery TAT": DAYS,
+    "E2E TAT Status": CATEGORY,
+}
+
+# Numbers typed into the workbook by hand: read as text, and cells that are
+# not a whole number become <NA> instead of failing the whole read
+COERCED_COLUMNS = ["Order Pincode"]
+
+# ---------------- DASHBOARD COLUMN SETS ----------------
+# app.py: filters, KPIs, charts and the pincode map
+APP_COLUMNS = [
+    "UC Order Date (Date)",
+    "Facility",
+    "Shipping provider",
+    "Shipping Courier",
+    "Zone",
+    "Order Pincode",
+    "Final Status",
+    "Reshipped",
+    "Dispatch TAT Status",
+    "Placed to Delivery TAT Status",
+    "Consumer to Delivery TAT Status",
+    "Pickup to Delivery TAT Status",
+    "E2E TAT Status",
+    "Final Shipment",
+]
+
+# int.py: pivot variables offered in the "Select Pivot Variable" box, every
+# report column in report order (as int.py has always offered)
+INT_PIVOT_COLUMNS = list(OUTPUT_SCHEMA)
+
+# int.py: everything the pivots need on top of the pivot variables
+INT_COLUMNS = list(dict.fromkeys(INT_PIVOT_COLUMNS + [
+    "UNICOM Order ID",
+    "UC Order Date (Date)",
+    "Dispatch TAT Status",
+    "Placed to Delivery TAT Status",
+    "Consumer to Delivery TAT Status",
+    "Pickup to Delivery TAT Status",
+    "E2E TAT Status",
+]))
+
+
+# ---------------- TYPED LOAD ----------------
+def coerce_whole_numbers(values, dtype):
+    # Categorical text -> nullable integer; converted per category, gathered by code
+    numbers = pd.to_numeric(pd.Series(values.cat.categories).str.strip(), errors="coerce")
+    numbers = numbers.where(numbers == numbers.round())
+    table = np.append(numbers.to_numpy(dtype=float), np.nan)
+    return pd.Series(table[values.cat.codes], index=values.index, name=values.name).astype(dtype)
+
+
+def load_output_report(path=OUTPUT_FILE, columns=None):
+    # Header names are matched after stripping, same as int.py did
+    raw_columns = pd.read_csv(path, nrows=0).columns
+    wanted = set(columns) if columns is not None else set(OUTPUT_SCHEMA)
+
+    selected = {raw: raw.strip() for raw in raw_columns if raw.strip() in wanted}
+
+    dtypes = {}
+    for raw, name in selected.items():
+        kind = OUTPUT_SCHEMA.get(name)
+        if kind is None:
+            continue
+        # Dates and coerced numbers arrive as categories: each distinct
+        # string is converted once
+        dtypes[raw] = CATEGORY if kind == DATE or name in COERCED_COLUMNS else kind
+
+    df = pd.read_csv(path, usecols=list(selected), dtype=dtypes)
+    df = df.rename(columns=selected)
+
+    date_cols = [col for col in df.columns if OUTPUT_SCHEMA.get(col) == DATE]
+    df.attrs["date_parse"] = parse_date_columns(df, date_cols, OUTPUT_DATE_FORMAT)
+
+    for col in COERCED_COLUMNS:
+        if col in df.columns:
+            df[col] = coerce_whole_numbers(df[col], OUTPUT_SCHEMA[col])
+
+    # Keep the caller's column order
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+
+    return df
+
+
+# ---------------- PINCODE MASTER ----------------
+PINCODE_FILE = "pincode.csv"
+
+
+def load_pincode_master(path=PINCODE_FILE):
+    df = pd.read_csv(path)
+
+    # Rename columns to match app expectations
+    df = df.rename(columns={
+        "Pincode": "pincode",
+        "Latitude": "latitude",
+        "Longitude": "longitude"
+    })
+
+    # 🔴 CRITICAL FIX: force numeric conversion
+    df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
+    df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
+
+    # Same dtype as "Order Pincode" in the typed output report
+    df["pincode"] = pd.to_numeric(df["pincode"], errors="coerce").astype("Int32")
+
+    return df
+
+
+# ---------------- MEMORY REPORT ----------------
+def memory_per_row(df):
+    rows = max(len(df), 1)
+    usage = df.memory_usage(deep=True, index=False)
+    report = (usage / rows).round(1).rename("bytes/row").to_frame()
+    report.loc["TOTAL"] = round(usage.sum() / rows, 1)
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_FILE
+
+    loads = {
+        "inferred (all columns)": pd.read_csv(path),
+        "typed (all columns)": load_output_report(path),
+        "app.py": load_output_report(path, APP_COLUMNS),
+        "int.py": load_output_report(path, INT_COLUMNS),
+    }
+
+    print(f"{'load':<24}{'columns':>8}{'bytes/row':>12}{'saving':>9}")
+    baseline = None
+    for label, frame in loads.items():
+        per_row = memory_per_row(frame).loc["TOTAL", "bytes/row"]
+        baseline = baseline or per_row
+        saving = (1 - per_row / baseline) * 100
+        print(f"{label:<24}{frame.shape[1]:>8}{per_row:>12.1f}{saving:>8.1f}%")
+
+    print()
+    print(memory_per_row(loads["app.py"]).to_string())
+
+#python schema.py Output_Report.csv
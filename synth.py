@@ -0,0 +1,193 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import input as etl
+
+# Synthetic Consolidated_Report / Output_Report / pincode data with
+# realistic Zone, Facility, courier, status and date-gap distributions.
+
+# ---------------- DISTRIBUTIONS ----------------
+ZONES = {"A": 0.10, "B": 0.24, "C": 0.24, "D": 0.20, "E": 0.06, "SDD": 0.05, "NDD": 0.11}
+
+FACILITIES = {"Warehouse": 0.58, "Dark Store": 0.36, "Dark\nStore ": 0.04, "warehouse ": 0.02}
+
+SERIES = {"Retail": 0.55, "Marketplace": 0.30, "B2B": 0.10, "Subscription": 0.05}
+
+PAYMENT_METHODS = {"Prepaid": 0.64, "COD": 0.36}
+
+# Provider → (share, {courier: share within provider})
+PROVIDERS = {
+    "Shiprocket": (0.45, {"BlueDart": 0.30, "Delhivery Surface": 0.25, "Xpressbees": 0.25, "Ekart": 0.20}),
+    "Delhivery": (0.30, {"Delhivery": 0.80, "Delhivery Express": 0.20}),
+    "Shadowfax": (0.15, {"Shadowfax": 1.0}),
+    "Self Ship": (0.10, {"Own Fleet": 1.0}),
+}
+
+FINAL_STATUSES = {
+    "Delivered": 0.78,
+    "RTO": 0.07,
+    "In-Transit": 0.08,
+    "In-Transit, Delayed": 0.03,
+    "In-Transit, Damaged/Lost": 0.01,
+    "OutForPickup": 0.03,
+}
+
+CITIES = ["Mumbai", "Delhi", "Bengaluru", "Pune", "Hyderabad", "Chennai", "Kolkata",
+          "Ahmedabad", "Jaipur", "Lucknow", "Indore", "Kochi", "Guwahati", "Patna"]
+
+EXCEL_MAX_ROWS = 1_048_575
+
+PINCODE_POOL = 4000
+RESHIP_RATE = 0.03
+RESHIP_GAP_DAYS = (2, 10)
+NOT_DISPATCHED_RATE = 0.04
+MISSING_PICKUP_RATE = 0.08
+
+
+def pick(rng, weights, size):
+    labels = list(weights)
+    probs = np.array(list(weights.values()), dtype=float)
+    return np.asarray(labels, dtype=object)[rng.choice(len(labels), size=size, p=probs / probs.sum())]
+
+
+def pincodes(seed=0):
+    rng = np.random.default_rng(seed)
+    codes = np.sort(rng.choice(np.arange(110001, 855117), PINCODE_POOL, replace=False))
+    return pd.DataFrame({
+        "Pincode": codes,
+        "Latitude": rng.uniform(8.0, 34.0, PINCODE_POOL).round(4),
+        "Longitude": rng.uniform(69.0, 95.0, PINCODE_POOL).round(4),
+    })
+
+
+# ---------------- CONSOLIDATED REPORT ----------------
+def consolidated_report(rows, seed=0, start="2025-01-01", days=180):
+    rng = np.random.default_rng(seed)
+
+    # Order dates: weekday-weighted with a mild ramp across the range
+    day_weights = np.linspace(0.8, 1.2, days) * np.where(
+        pd.date_range(start, periods=days).dayofweek < 5, 1.0, 0.7
+    )
+    order_offset = rng.choice(days, size=rows, p=day_weights / day_weights.sum())
+    order_date = pd.Timestamp(start) + pd.to_timedelta(order_offset, unit="D")
+
+    zone = pick(rng, ZONES, rows)
+    facility = pick(rng, FACILITIES, rows)
+
+    provider = pick(rng, {name: share for name, (share, _) in PROVIDERS.items()}, rows)
+    courier = np.empty(rows, dtype=object)
+    for name, (_, couriers) in PROVIDERS.items():
+        chosen = provider == name
+        courier[chosen] = pick(rng, couriers, int(chosen.sum()))
+
+    final_status = pick(rng, FINAL_STATUSES, rows)
+
+    # Date gaps: dispatch 0–1 day, pickup geometric, delivery around the zone TAT
+    ideal_dispatch = order_date + pd.to_timedelta(rng.integers(0, 2, rows), unit="D")
+    assigned = ideal_dispatch + pd.to_timedelta(rng.integers(0, 2, rows), unit="D")
+    pickup = ideal_dispatch + pd.to_timedelta(rng.geometric(0.8, rows) - 1, unit="D")
+
+    zone_days = pd.Series(zone).str.lower().map(etl.zone_map).to_numpy()
+    delivery = pickup + pd.to_timedelta(
+        np.maximum(zone_days + rng.poisson(0.4, rows) - rng.integers(0, 2, rows), 0), unit="D"
+    )
+
+    pickup = pickup.where(rng.random(rows) > MISSING_PICKUP_RATE)
+    delivery = delivery.where(final_status == "Delivered")
+
+    # Reshipments reuse an earlier shipment's Devx Order ID and follow it by
+    # a few days; every date of the row moves together
+    devx_number = np.arange(rows)
+    reshipped = rng.random(rows) < RESHIP_RATE
+    reship_rows = np.flatnonzero(reshipped)
+    original = np.minimum(rng.integers(0, rows, len(reship_rows)), reship_rows)
+    gap = rng.integers(RESHIP_GAP_DAYS[0], RESHIP_GAP_DAYS[1] + 1, len(reship_rows))
+
+    shift = np.zeros(rows, dtype=np.int64)
+    for row, source, days in zip(reship_rows, original, gap):
+        if source != row:
+            devx_number[row] = devx_number[source]
+            shift[row] = order_offset[source] + shift[source] + days - order_offset[row]
+
+    shift = pd.to_timedelta(shift, unit="D")
+    order_date, ideal_dispatch, assigned = order_date + shift, ideal_dispatch + shift, assigned + shift
+    pickup, delivery = pickup + shift, delivery + shift
+
+    pool = pincodes(seed)["Pincode"].to_numpy()
+    popularity = 1.0 / np.arange(1, PINCODE_POOL + 1)
+
+    return pd.DataFrame({
+        "Devx Order ID": pd.Series(devx_number).map("DX{:08d}".format),
+        "Devx Order Date (Date)": order_date,
+        "Devx Order Status": "Complete",
+        "Payment method": pick(rng, PAYMENT_METHODS, rows),
+        "UC Order Date (Date)": order_date,
+        "Ideal Dispatch Date": ideal_dispatch,
+        "Ideal Dispatch Date(R)": ideal_dispatch,
+        "Facility": facility,
+        "Series": pick(rng, SERIES, rows),
+        "Facility Type": np.where(pd.Series(facility).str.lower().str.contains("dark"), "Dark Store", "Warehouse"),
+        "Shipping Address City": np.asarray(CITIES, dtype=object)[rng.integers(0, len(CITIES), rows)],
+        "Order Pincode": pool[rng.choice(PINCODE_POOL, rows, p=popularity / popularity.sum())],
+        "UC Order Status": "COMPLETE",
+        "UC Shipping Package Status": np.where(final_status == "Delivered", "DELIVERED", "SHIPPED"),
+        "Dispatch Date (Date)": ideal_dispatch,
+        "UNICOM Order ID": pd.Series(np.arange(rows)).map("UC{:09d}".format),
+        "Shipping provider": provider,
+        "Shipping Courier": courier,
+        "Tracking No.": pd.Series(rng.integers(10**11, 10**12, rows)).astype(str),
+        "Assigned Date_D": assigned,
+        "CP Order Status": final_status,
+        "Pickup Date (Date)": pickup,
+        "Delivery Date (Date)": delivery,
+        "Final Status": final_status,
+        "Zone": zone,
+        "Reshipped": np.where(reshipped, "Yes", "No"),
+        "Order Dispatched": np.where(rng.random(rows) < NOT_DISPATCHED_RATE, "No", "Yes"),
+    })
+
+
+# ---------------- OUTPUT REPORT ----------------
+def output_report(rows, seed=0, start="2025-01-01", days=180):
+    # Run the real ETL transform so the shape always matches input.py
+    return etl.transform(consolidated_report(rows, seed, start, days))
+
+
+def write_dataset(out_dir, rows, seed=0, start="2025-01-01", days=180, excel=False):
+    if excel and rows > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS} rows, got {rows}")
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    raw = consolidated_report(rows, seed, start, days)
+    if excel:
+        raw.to_excel(os.path.join(out_dir, etl.INPUT_FILE), index=False)
+
+    etl.transform(raw).to_csv(os.path.join(out_dir, etl.OUTPUT_FILE), index=False)
+    pincodes(seed).to_csv(os.path.join(out_dir, "pincode.csv"), index=False)
+
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Consolidated/Output report dataset")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--out", default="synthetic_data")
+    parser.add_argument("--excel", action="store_true",
+                        help="also write Consolidated_Report.xlsx (max 1,048,575 rows)")
+    args = parser.parse_args()
+
+    write_dataset(args.out, args.rows, args.seed, args.start, args.days, args.excel)
+    print(f"{args.rows} synthetic orders written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
+
+#python synth.py --rows 1000000 --out synthetic_1m
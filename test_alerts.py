@@ -0,0 +1,31 @@
+import numpy as np
+
+import alerts
+import synth
+
+
+def first_run(tmp_path):
+    df = synth.output_report(2_000, seed=0)
+    df["Tracking No."] = df["Tracking No."].astype(np.int64)
+
+    state, events = str(tmp_path / "alerts.sqlite"), str(tmp_path / "alerts.jsonl")
+    alerts.process_run(df, state, events)
+    return df, state, events
+
+
+def test_unchanged_run_is_empty(tmp_path):
+    df, state, events = first_run(tmp_path)
+
+    run = alerts.process_run(df, state, events)
+    assert (run["changed"], run["removed"]) == (0, 0)
+
+
+def test_blank_in_integer_key_changes_one_order(tmp_path):
+    df, state, events = first_run(tmp_path)
+
+    # One blank turns the whole column float64
+    df.loc[df.index[5], "Tracking No."] = np.nan
+    assert df["Tracking No."].dtype == np.float64
+
+    run = alerts.process_run(df, state, events)
+    assert (run["changed"], run["removed"]) == (1, 1)